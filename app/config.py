@@ -11,7 +11,132 @@ class Settings(BaseSettings):
     MONGODB_DB: str
 
     OPENAI_API_KEY: str
-    
+
+    # Request bodies over this are rejected with a 413 while being received
+    MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024  # 20MB
+
+    # Load NLP models and API clients in the background at startup
+    # (otherwise they load on first use)
+    MODEL_WARMUP: bool = True
+
+    # Shared inference sidecar (python -m app.inference.server) hosting the
+    # spaCy and sentiment models for every worker. Empty = run in-process.
+    INFERENCE_SOCKET: str = ""
+    INFERENCE_AUTHKEY: str = ""  # shared secret, required by the sidecar and its clients
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_TORCH_THREADS: int = 0  # 0 = torch default
+    INFERENCE_FALLBACK_LOCAL: bool = True  # run in-process if the sidecar is down
+
+    # Embedding provider: openai | local (sentence-transformers on the CPU).
+    # The Qdrant collection is created with the provider's vector size.
+    EMBEDDING_PROVIDER: str = "openai"
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    LOCAL_EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    LOCAL_EMBEDDING_DIM: int = 384
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 32
+    LOCAL_EMBEDDING_THREADS: int = 0  # 0 = torch default
+
+    # Embedding size (0 = the model's full size, text-embedding-3 can shorten
+    # vectors), and an optional compact size: the collection then stores a
+    # compact vector for the HNSW search and the full one to re-score the
+    # top candidates
+    EMBEDDING_DIM: int = 0
+    EMBEDDING_COMPACT_DIM: int = 0  # 0 = off, e.g. 256
+    COMPACT_RESCORE_MULTIPLIER: int = 4  # compact candidates per result re-scored with the full vector
+
+    # Qdrant
+    QDRANT_HOST: str = "localhost"
+    QDRANT_PORT: int = 6333
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_COLLECTION: str = "documents_embeddings"
+    QDRANT_POOL_SIZE: int = 20
+    QDRANT_TIMEOUT: int = 10
+    # Storage/index profile for the collection: default | scalar | binary | high_recall
+    # (see app/db/collection_profiles.py, apply to an existing collection with
+    # python -m app.db.migrate_collection)
+    QDRANT_PROFILE: str = "default"
+
+    # Retrieval: dense | sparse (BM25) | hybrid (both, fused with reciprocal
+    # rank fusion). Used by /chat, and by /search/ unless it passes a mode.
+    # Opt in to hybrid explicitly: its scores are RRF sums (~0.03), not
+    # cosine similarities.
+    SEARCH_MODE: str = "dense"
+    HYBRID_CANDIDATE_MULTIPLIER: int = 4  # each search returns top_k * this before fusion
+    RRF_K: int = 60
+
+    # Persistent chunk embedding cache (MongoDB)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000
+
+    # In-process LRU cache of query embeddings (search and chat). SHARED also
+    # reads/writes the MongoDB embedding cache above on an in-process miss.
+    QUERY_EMBEDDING_CACHE_ENABLED: bool = True
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES: int = 10_000
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 86_400
+    QUERY_EMBEDDING_CACHE_SHARED: bool = False
+
+    # Batched embedding (API limits are 2048 inputs / 300k tokens per request)
+    EMBEDDING_BATCH_MAX_INPUTS: int = 256
+    EMBEDDING_BATCH_MAX_TOKENS: int = 50_000
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 5
+
+    # PDF extraction: page ranges are split across a process pool for
+    # documents with at least PDF_PARALLEL_MIN_PAGES pages
+    PDF_EXTRACTION_ENGINE: str = "auto"  # auto | pdfium | pdfplumber
+    PDF_EXTRACT_WORKERS: int = 4
+    PDF_PARALLEL_MIN_PAGES: int = 40
+
+    # spaCy NER batching
+    SPACY_BATCH_SIZE: int = 64
+    SPACY_MAX_SEGMENT_CHARS: int = 10_000
+
+    # Sentiment model backend, and batching of concurrent detect_emotion calls
+    SENTIMENT_BACKEND: str = "fp32"  # fp32 | int8 | onnx
+    SENTIMENT_ONNX_DIR: str = "models/sentiment-onnx"  # onnx export, created on first use
+    SENTIMENT_BATCHING: bool = True
+    SENTIMENT_MAX_BATCH_SIZE: int = 16
+    SENTIMENT_MAX_WAIT_MS: float = 5.0
+
+    # Semantic cache of first-turn /chat answers, matched by cosine similarity
+    # of the question embeddings and dropped when the documents change
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_THRESHOLD: float = 0.95
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+
+    # Background ingestion (extract -> entities -> chunk -> embed)
+    INGESTION_WORKERS: int = 2
+    INGESTION_ON_UPLOAD: bool = False
+    INGESTION_EXTRACT_CONCURRENCY: int = 2
+    INGESTION_ENTITIES_CONCURRENCY: int = 1
+    INGESTION_EMBED_CONCURRENCY: int = 2
+    INGESTION_LEASE_SECONDS: int = 900
+    INGESTION_POLL_SECONDS: float = 2.0
+    INGESTION_MAX_ATTEMPTS: int = 3
+
+    # Where chat messages live: embedded (last 10 kept on the conversation
+    # document) | collection (full history in a separate messages collection,
+    # the latest 10 read for the prompt)
+    MESSAGE_STORE: str = "embedded"
+
+    # In-process cache of each conversation's recent messages. With VERIFY a
+    # cached window is checked against Mongo with a version-only read before
+    # use, which keeps it correct when several workers serve one
+    # conversation. Turn it off for a single worker or sticky routing.
+    CONVERSATION_CACHE_ENABLED: bool = True
+    CONVERSATION_CACHE_MAX_ENTRIES: int = 5000
+    CONVERSATION_CACHE_TTL_SECONDS: int = 900
+    CONVERSATION_CACHE_VERIFY: bool = True
+
+    # Observability: Prometheus histograms on GET /metrics, per-request log
+    # lines, and optional OpenTelemetry spans (console | file)
+    METRICS_ENABLED: bool = True
+    REQUEST_LOGGING: bool = True
+    TRACING_EXPORTER: str = ""
+    TRACING_FILE: str = "traces.jsonl"
+
     # Later can add:
     # DB_URL: str
 
@@ -0,0 +1,67 @@
+import re
+import zlib
+from collections import Counter
+from qdrant_client.models import SparseVector
+
+# Name of the sparse vector in the Qdrant collection. Qdrant applies the IDF
+# part of BM25 at query time (Modifier.IDF), the documents store the
+# saturated term frequency part.
+SPARSE_VECTOR_NAME = "bm25"
+
+K1 = 1.2
+B = 0.75
+# Chunks are a fixed 800 characters, so their length in tokens barely varies
+AVG_DOC_TOKENS = 130
+
+# Keeps identifiers like "E-4012", "INV-2024-0031" or "x200.v2" in one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+SEPARATORS = re.compile(r"[-_./]")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "does",
+    "for", "from", "how", "i", "if", "in", "is", "it", "its", "my", "of", "on",
+    "or", "so", "that", "the", "their", "there", "this", "to", "was", "we",
+    "what", "when", "where", "which", "who", "why", "will", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+
+        # Also index the parts of a compound identifier, so "4012" finds "E-4012"
+        if SEPARATORS.search(token):
+            tokens.extend(part for part in SEPARATORS.split(token) if part and part not in STOPWORDS)
+
+    return tokens
+
+
+def token_index(token: str) -> int:
+    # Stable across processes, unlike hash()
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _to_sparse(weights: dict[int, float]) -> SparseVector:
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+
+def encode_document(text: str) -> SparseVector:
+    tokens = tokenize(text)
+    length_norm = 1 - B + B * len(tokens) / AVG_DOC_TOKENS
+
+    weights: dict[int, float] = {}
+    for token, tf in Counter(tokens).items():
+        idx = token_index(token)
+        # hash collisions are rare enough to just add up
+        weights[idx] = weights.get(idx, 0.0) + tf * (K1 + 1) / (tf + K1 * length_norm)
+
+    return _to_sparse(weights)
+
+
+def encode_query(text: str) -> SparseVector:
+    # Each distinct query term counts once, IDF does the weighting
+    return _to_sparse({token_index(token): 1.0 for token in set(tokenize(text))})
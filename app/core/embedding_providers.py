@@ -0,0 +1,177 @@
+import time
+import random
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from openai import (
+    RateLimitError,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+)
+from app.config import settings
+from app.core.model_registry import registry
+from app.core.openai_clients import get_openai_client, get_async_openai_client
+from app.core.metrics import observe_upstream
+
+
+class EmbeddingProvider(ABC):
+    """
+    Turns texts into vectors. Each provider declares the size of the vectors
+    it returns, which the Qdrant collection is created with.
+
+    :param model: model name
+    :param dimension: length of the returned vectors
+    :param supports_truncation: leading dimensions can be used as a shorter
+        embedding (Matryoshka-style, e.g. text-embedding-3), which compact
+        vectors rely on
+    """
+    name = ""
+
+    def __init__(self, model: str, dimension: int, supports_truncation: bool = False):
+        self.model = model
+        self.dimension = dimension
+        self.supports_truncation = supports_truncation
+
+    @property
+    def id(self) -> str:
+        # Identifies the vectors in caches and checkpoints
+        return f"{self.name}:{self.model}@{self.dimension}"
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        ...
+
+    async def embed_async(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.to_thread(self.embed, texts)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    name = "openai"
+
+    # Full sizes; text-embedding-3 models can return shorter vectors
+    NATIVE_DIMENSIONS = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+
+    RETRYABLE_ERRORS = (
+        RateLimitError,
+        APIConnectionError,
+        APITimeoutError,
+        InternalServerError,
+    )
+    BACKOFF_BASE_SECONDS = 1.0
+    BACKOFF_MAX_SECONDS = 30.0
+
+    def __init__(self, model: str, dimension: int = 0):
+        if model not in self.NATIVE_DIMENSIONS:
+            raise ValueError(f"Unknown OpenAI embedding model '{model}'")
+
+        self.native_dimension = self.NATIVE_DIMENSIONS[model]
+        shortenable = model.startswith("text-embedding-3")
+        dimension = dimension or self.native_dimension
+        if dimension > self.native_dimension or (dimension != self.native_dimension and not shortenable):
+            raise ValueError(f"{model} can't return {dimension}-dimensional embeddings")
+
+        super().__init__(model, dimension, supports_truncation=shortenable)
+
+    @property
+    def id(self) -> str:
+        # Plain model name at full size, matching cache entries written before providers
+        if self.dimension == self.native_dimension:
+            return self.model
+        return f"{self.model}@{self.dimension}"
+
+    def request_options(self) -> dict:
+        if self.dimension == self.native_dimension:
+            return {}
+        return {"dimensions": self.dimension}
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        # Retries are handled here with our own backoff
+        client = get_openai_client().with_options(max_retries=0)
+
+        for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
+            try:
+                with observe_upstream("openai", "embeddings"):
+                    response = client.embeddings.create(
+                        model=self.model,
+                        input=texts,
+                        **self.request_options(),
+                    )
+                return [emb.embedding for emb in response.data]
+
+            except self.RETRYABLE_ERRORS:
+                if attempt == settings.EMBEDDING_MAX_RETRIES:
+                    raise
+                # exponential backoff with jitter
+                delay = min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def embed_async(self, texts: list[str]) -> list[list[float]]:
+        with observe_upstream("openai", "embeddings"):
+            response = await get_async_openai_client().embeddings.create(
+                model=self.model,
+                input=texts,
+                **self.request_options(),
+            )
+        return [emb.embedding for emb in response.data]
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    sentence-transformers model on the CPU, no network needed once the model
+    is downloaded. Calls are serialized and torch is limited to
+    LOCAL_EMBEDDING_THREADS, so concurrent embedding batches don't
+    oversubscribe the cores.
+    """
+    name = "local"
+
+    def __init__(self, model: str, dimension: int):
+        super().__init__(model, dimension)
+        self._lock = threading.Lock()
+        registry.register("local_embeddings", self.load)
+
+    def load(self):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError("EMBEDDING_PROVIDER=local requires `sentence-transformers` to be installed")
+
+        if settings.LOCAL_EMBEDDING_THREADS:
+            torch.set_num_threads(settings.LOCAL_EMBEDDING_THREADS)
+
+        model = SentenceTransformer(self.model, device="cpu")
+        actual = model.get_sentence_embedding_dimension()
+        if actual != self.dimension:
+            raise ValueError(f"{self.model} returns {actual}-dimensional embeddings, LOCAL_EMBEDDING_DIM is {self.dimension}")
+        return model
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        model = registry.get("local_embeddings")
+        with self._lock:
+            vectors = model.encode(
+                texts,
+                batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        return vectors.tolist()
+
+
+EMBEDDING_PROVIDERS = ("openai", "local")
+
+
+def create_embedding_provider(name: str) -> EmbeddingProvider:
+    if name == "openai":
+        return OpenAIEmbeddingProvider(settings.OPENAI_EMBEDDING_MODEL, settings.EMBEDDING_DIM)
+    if name == "local":
+        if settings.EMBEDDING_DIM and settings.EMBEDDING_DIM != settings.LOCAL_EMBEDDING_DIM:
+            raise ValueError("EMBEDDING_DIM can't shorten local embeddings, set LOCAL_EMBEDDING_DIM to the model's size")
+        return LocalEmbeddingProvider(settings.LOCAL_EMBEDDING_MODEL, settings.LOCAL_EMBEDDING_DIM)
+
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER '{name}', expected one of {', '.join(EMBEDDING_PROVIDERS)}")
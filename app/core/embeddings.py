@@ -1,3 +1,35 @@
-EMBEDDING_MODEL = "text-embedding-3-small"
-EMBEDDING_DIM = 1536
+import math
+from app.config import settings
+from app.core.embedding_providers import create_embedding_provider
 
+# The active embedding provider (EMBEDDING_PROVIDER). The collection's vector
+# size follows whatever it declares.
+embedding_provider = create_embedding_provider(settings.EMBEDDING_PROVIDER)
+
+EMBEDDING_MODEL = embedding_provider.model
+EMBEDDING_DIM = embedding_provider.dimension
+
+# Identifies the vectors in caches and checkpoints: a different model or
+# size produces different vectors
+EMBEDDING_ID = embedding_provider.id
+
+# Size of the compact vector used for first-stage search when the collection
+# stores both a compact and a full vector (0 = single full vector)
+COMPACT_DIM = settings.EMBEDDING_COMPACT_DIM
+
+if not 0 <= COMPACT_DIM < EMBEDDING_DIM:
+    raise ValueError("EMBEDDING_COMPACT_DIM must be smaller than the embedding size")
+if COMPACT_DIM and not embedding_provider.supports_truncation:
+    raise ValueError(f"{EMBEDDING_MODEL} embeddings can't be truncated, set EMBEDDING_COMPACT_DIM=0")
+
+
+def get_embedding_provider():
+    return embedding_provider
+
+
+def compact_vector(vector: list[float], dim: int) -> list[float]:
+    # text-embedding-3 vectors front-load their information, so truncating
+    # and re-normalizing gives the same vector as requesting `dimensions`
+    head = vector[:dim]
+    norm = math.sqrt(sum(x * x for x in head))
+    return [x / norm for x in head] if norm else head
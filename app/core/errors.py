@@ -15,6 +15,13 @@ def unsupported_file(message: str):
     )
 
 
+def payload_too_large(message: str):
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={"error": message}
+    )
+
+
 def duplicate_file(message: str):
     return HTTPException(
         status_code=409,
@@ -0,0 +1,122 @@
+import os
+import time
+import asyncio
+import inspect
+import functools
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+)
+from app.config import settings
+from app.core.tracing import start_span
+
+# Latency buckets from 5 ms to 60 s: cache hits to long completions and ingestion stages
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=BUCKETS,
+)
+
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent in each stage of a pipeline (chat, ingestion)",
+    ["pipeline", "stage", "outcome"],
+    buckets=BUCKETS,
+)
+
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to dependencies (openai, qdrant, mongodb, inference)",
+    ["upstream", "operation", "outcome"],
+    buckets=BUCKETS,
+)
+
+
+@contextmanager
+def _observe(histogram: Histogram, span_name: str, *labels: str):
+    if not settings.METRICS_ENABLED:
+        with start_span(span_name):
+            yield
+        return
+
+    outcome = "ok"
+    started = time.perf_counter()
+    try:
+        with start_span(span_name):
+            yield
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"  # e.g. the client went away mid-stream
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        histogram.labels(*labels, outcome).observe(time.perf_counter() - started)
+
+
+def observe_stage(pipeline: str, stage: str):
+    """Time a pipeline stage (histogram and, if tracing is on, a span)."""
+    return _observe(STAGE_SECONDS, f"{pipeline}.{stage}", pipeline, stage)
+
+
+def observe_upstream(upstream: str, operation: str):
+    """Time a call to a dependency (histogram and, if tracing is on, a span)."""
+    return _observe(UPSTREAM_SECONDS, f"{upstream}.{operation}", upstream, operation)
+
+
+async def timed_stage(pipeline: str, stage: str, awaitable):
+    # For timing coroutines passed to asyncio.gather
+    with observe_stage(pipeline, stage):
+        return await awaitable
+
+
+def timed_upstream(upstream: str, operation: str | None = None):
+    """
+    Decorator timing every call of a function (sync, async or async
+    generator, whose whole iteration is timed) as an upstream request.
+    """
+    def decorator(fn):
+        name = operation or fn.__name__
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def gen_wrapper(*args, **kwargs):
+                with observe_upstream(upstream, name):
+                    async for item in fn(*args, **kwargs):
+                        yield item
+            return gen_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with observe_upstream(upstream, name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with observe_upstream(upstream, name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def render_metrics() -> tuple[bytes, str]:
+    # Under several uvicorn workers, PROMETHEUS_MULTIPROC_DIR makes each
+    # process write its samples to files that are aggregated here
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,80 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads for up to `max_wait_ms`, then
+    runs them through `batch_fn` as a single batch and hands each caller its
+    own result.
+
+    :param batch_fn: takes a list of items, returns a list of results in the same order
+    :param max_batch_size: largest batch passed to batch_fn
+    :param max_wait_ms: how long the first item in a batch waits for company
+    """
+
+    def __init__(self, batch_fn: Callable[[list], list], max_batch_size: int, max_wait_ms: float, name: str = "micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        return self.submit(item).result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _collect_batch(self) -> list[tuple[Any, Future]]:
+        batch = [self._queue.get()]  # block until there is work
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            # Drop items whose callers gave up, the rest can no longer be
+            # cancelled so setting their results below can't fail
+            batch = [(item, future) for item, future in self._collect_batch() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+
+            # Every future gets a result or an exception, whatever batch_fn
+            # does: callers block on them, and this thread must keep running
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(batch):
+                    raise ValueError(f"{self.name}: batch_fn returned {len(results)} results for {len(batch)} items")
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,77 @@
+import time
+import threading
+from typing import Any, Callable
+
+
+class ModelRegistry:
+    """
+    Heavy resources (NLP models, API clients) are registered with a loader
+    and only built on first use, or by an optional background warm-up.
+    """
+
+    def __init__(self):
+        self._loaders: dict[str, Callable[[], Any]] = {}
+        self._models: dict[str, Any] = {}
+        self._load_seconds: dict[str, float] = {}
+        self._errors: dict[str, str] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._warmup_thread: threading.Thread | None = None
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        if name in self._models:
+            return self._models[name]
+
+        with self._locks[name]:
+            # another thread may have loaded it while we waited
+            if name not in self._models:
+                started = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._load_seconds[name] = round(time.perf_counter() - started, 3)
+                self._errors.pop(name, None)
+
+        return self._models[name]
+
+    def names(self) -> list[str]:
+        return list(self._loaders)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warm_up(self, names: list[str] | None = None):
+        # Loads models in a background thread so startup isn't blocked
+        names = list(self._loaders) if names is None else names
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"[WARMUP] failed to load {name}: {e}")
+
+        self._warmup_thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+        self._warmup_thread.start()
+
+    @property
+    def warming_up(self) -> bool:
+        return self._warmup_thread is not None and self._warmup_thread.is_alive()
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "loaded": name in self._models,
+                "load_seconds": self._load_seconds.get(name),
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,14 @@
+from openai import OpenAI, AsyncOpenAI
+from app.core.model_registry import registry
+
+# One client of each kind per process, shared by every service
+registry.register("openai", OpenAI)
+registry.register("openai_async", AsyncOpenAI)
+
+
+def get_openai_client() -> OpenAI:
+    return registry.get("openai")
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    return registry.get("openai_async")
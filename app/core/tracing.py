@@ -0,0 +1,46 @@
+from contextlib import nullcontext
+from app.config import settings
+
+# OpenTelemetry is optional: spans are only created when TRACING_EXPORTER is
+# set (and `opentelemetry-sdk` is installed)
+_tracer = None
+
+
+def init_tracing():
+    global _tracer
+    if not settings.TRACING_EXPORTER or _tracer is not None:
+        return
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        raise RuntimeError("TRACING_EXPORTER requires `opentelemetry-sdk` to be installed")
+
+    if settings.TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    elif settings.TRACING_EXPORTER == "file":
+        # One JSON span per line
+        out = open(settings.TRACING_FILE, "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER '{settings.TRACING_EXPORTER}', expected console or file")
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "ai-support-agent"}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("app")
+
+
+def shutdown_tracing():
+    if _tracer is not None:
+        from opentelemetry import trace
+        trace.get_tracer_provider().shutdown()
+
+
+def start_span(name: str, attributes: dict | None = None):
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
@@ -0,0 +1,91 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries also expire `ttl_seconds`
+    after they were stored.
+
+    :param max_entries: least recently used entries are evicted past this size
+    :param ttl_seconds: entry lifetime, 0 means entries never expire
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - stored_at > self.ttl_seconds
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+
+            stored_at, value = entry
+            if self._expired(stored_at, now):
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def touch(self, key: Hashable):
+        # Mark as recently used without counting a lookup
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """Snapshot of the live entries, dropping expired ones. Doesn't affect LRU order."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (stored_at, _) in self._entries.items() if self._expired(stored_at, now)]
+            for key in expired:
+                del self._entries[key]
+            self._stats["expirations"] += len(expired)
+            return [(key, value) for key, (_, value) in self._entries.items()]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    VectorParamsDiff,
+    HnswConfigDiff,
+    SearchParams,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Disabled,
+)
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """
+    Storage and index settings for the chunk collection.
+
+    :param quantization: None, "scalar" (int8, 4x smaller) or "binary" (1 bit per dimension, 32x smaller)
+    :param on_disk: keep the original float32 vectors on disk (quantized copies stay in RAM)
+    :param hnsw_m: edges per node in the HNSW graph
+    :param hnsw_ef_construct: candidate list size while building the graph
+    :param search_ef: candidate list size at query time, None for Qdrant's default
+    :param rescore: re-score quantized candidates with the original vectors
+    :param oversampling: fetch top_k * oversampling quantized candidates before rescoring
+    """
+    quantization: str | None = None
+    on_disk: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_ef: int | None = None
+    rescore: bool = False
+    oversampling: float | None = None
+
+    def vectors_config(self, size: int, with_quantization: bool = False) -> VectorParams:
+        # with_quantization sets it on this vector rather than collection-wide
+        return VectorParams(
+            size=size,
+            distance=Distance.COSINE,
+            on_disk=self.on_disk,
+            quantization_config=self.quantization_config() if with_quantization else None,
+        )
+
+    def vectors_config_diff(self, with_quantization: bool = False) -> VectorParamsDiff:
+        return VectorParamsDiff(
+            on_disk=self.on_disk,
+            quantization_config=quantization_update(self) if with_quantization else None,
+        )
+
+    def hnsw_config(self) -> HnswConfigDiff:
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True),
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def search_params(self) -> SearchParams | None:
+        if self.search_ef is None and not self.quantization:
+            return None
+
+        quantization = None
+        if self.quantization:
+            quantization = QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+
+        return SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+    def estimated_ram_bytes(self, points: int, size: int) -> int:
+        # Rough resident size: vectors kept in RAM plus the HNSW graph links
+        ram = 0 if self.on_disk else points * size * 4
+        if self.quantization == "scalar":
+            ram += points * size
+        elif self.quantization == "binary":
+            ram += points * size // 8
+        return ram + points * self.hnsw_m * 2 * 4
+
+
+COLLECTION_PROFILES = {
+    # float32 vectors in RAM, Qdrant's default HNSW
+    "default": CollectionProfile(),
+    # int8 copies in RAM, originals on disk for rescoring the top candidates
+    "scalar": CollectionProfile(
+        quantization="scalar",
+        on_disk=True,
+        hnsw_ef_construct=128,
+        search_ef=128,
+        rescore=True,
+        oversampling=2.0,
+    ),
+    # 1-bit copies in RAM; works well for high-dimensional OpenAI embeddings
+    # but needs more oversampling to recover recall
+    "binary": CollectionProfile(
+        quantization="binary",
+        on_disk=True,
+        hnsw_ef_construct=128,
+        search_ef=128,
+        rescore=True,
+        oversampling=3.0,
+    ),
+    # float32 in RAM with a denser graph, for small corpora that want recall
+    "high_recall": CollectionProfile(hnsw_m=32, hnsw_ef_construct=256, search_ef=256),
+}
+
+
+def get_profile(name: str) -> CollectionProfile:
+    if name not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown QDRANT_PROFILE '{name}', expected one of {', '.join(COLLECTION_PROFILES)}")
+    return COLLECTION_PROFILES[name]
+
+
+def quantization_update(profile: CollectionProfile):
+    # update_collection needs an explicit Disabled to drop existing quantization
+    return profile.quantization_config() or Disabled.DISABLED
+
+
+def profile_differences(collection_info, profile: CollectionProfile) -> list[str]:
+    """What an existing collection would need to change to match `profile`."""
+    differences = []
+    config = collection_info.config
+
+    vectors = config.params.vectors
+    # The searched dense vector: the default one, or the compact one
+    dense = vectors.get("") or vectors.get("compact") if isinstance(vectors, dict) else vectors
+    if dense is not None and bool(dense.on_disk) != profile.on_disk:
+        differences.append(f"on_disk {bool(dense.on_disk)} -> {profile.on_disk}")
+
+    if config.hnsw_config.m != profile.hnsw_m:
+        differences.append(f"hnsw m {config.hnsw_config.m} -> {profile.hnsw_m}")
+    if config.hnsw_config.ef_construct != profile.hnsw_ef_construct:
+        differences.append(f"hnsw ef_construct {config.hnsw_config.ef_construct} -> {profile.hnsw_ef_construct}")
+
+    current = None
+    quantization = config.quantization_config or (dense.quantization_config if dense else None)
+    if isinstance(quantization, ScalarQuantization):
+        current = "scalar"
+    elif isinstance(quantization, BinaryQuantization):
+        current = "binary"
+    if current != profile.quantization:
+        differences.append(f"quantization {current} -> {profile.quantization}")
+
+    return differences
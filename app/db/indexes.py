@@ -0,0 +1,52 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from app.config import settings
+from app.db.mongodb import db
+
+# Every Mongo index the app relies on, created at startup. create_indexes
+# is a no-op for indexes that already exist.
+INDEXES = {
+    "documents": [
+        IndexModel([("file_id", ASCENDING)], unique=True),
+        # Uploads are de-duplicated by content hash
+        IndexModel(
+            [("file_hash", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"file_hash": {"$type": "string"}},
+        ),
+    ],
+    "conversations": [
+        IndexModel([("conversation_id", ASCENDING)], unique=True),
+        IndexModel([("updated_at", DESCENDING)]),
+    ],
+    "embedding_cache": [
+        IndexModel([("key", ASCENDING)], unique=True),
+        IndexModel([("last_used_at", ASCENDING)]),
+    ],
+    "ingestion_jobs": [
+        IndexModel([("job_id", ASCENDING)], unique=True),
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+        IndexModel([("file_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+}
+
+# Only used with MESSAGE_STORE=collection. _id breaks ties between messages
+# stored in the same millisecond, so the latest N are read straight off the index.
+MESSAGE_INDEXES = [
+    IndexModel([("conversation_id", ASCENDING), ("ts", DESCENDING), ("_id", DESCENDING)]),
+]
+
+
+def ensure_indexes():
+    indexes = dict(INDEXES)
+    if settings.MESSAGE_STORE == "collection":
+        indexes["messages"] = MESSAGE_INDEXES
+
+    for collection_name, models in indexes.items():
+        for model in models:
+            try:
+                db[collection_name].create_indexes([model])
+            except OperationFailure as e:
+                # e.g. existing duplicates blocking a unique index. The app
+                # still works, the lookup just isn't indexed (or enforced)
+                print(f"[MONGODB] couldn't create index {model.document['key']} on '{collection_name}': {e}")
@@ -0,0 +1,151 @@
+"""
+Bring the existing chunk collection in line with the current settings.
+
+In place (default): applies QDRANT_PROFILE's quantization, on-disk and HNSW
+settings with update_collection. Qdrant rebuilds the indexes in the
+background and the collection stays searchable meanwhile.
+
+    python -m app.db.migrate_collection [--profile scalar] [--dry-run]
+
+Copy: creates a new collection with the full current schema (profile, BM25
+sparse vector and EMBEDDING_COMPACT_DIM compact vector, which can't be
+added in place) and copies every point into it, computing the sparse and
+compact vectors from the stored text and full vector. No embeddings are
+recomputed. Point QDRANT_COLLECTION at the new collection once it's done.
+
+    python -m app.db.migrate_collection --copy-to documents_embeddings_v2
+"""
+import time
+import argparse
+
+from dotenv import load_dotenv
+load_dotenv() # Load the environment variables
+
+from qdrant_client.models import PointStruct
+from app.config import settings
+from app.core.embeddings import COMPACT_DIM
+from app.db.collection_profiles import COLLECTION_PROFILES, profile_differences, quantization_update
+from app.db.qdrant import (
+    COLLECTION_NAME,
+    COMPACT_VECTOR_NAME,
+    FULL_VECTOR_NAME,
+    get_qdrant_client,
+    create_collection,
+    detect_collection_layout,
+    uses_compact_vectors,
+    point_vectors,
+)
+
+COPY_BATCH_SIZE = 256
+
+
+def migrate_in_place(profile_name: str, dry_run: bool = False):
+    qdrant_client = get_qdrant_client()
+    profile = COLLECTION_PROFILES[profile_name]
+
+    info = qdrant_client.get_collection(COLLECTION_NAME)
+    detect_collection_layout(info)
+
+    differences = profile_differences(info, profile)
+    if not differences:
+        print(f"'{COLLECTION_NAME}' already matches profile '{profile_name}'")
+        return
+
+    print(f"'{COLLECTION_NAME}' -> '{profile_name}': {', '.join(differences)}")
+    if dry_run:
+        return
+
+    if uses_compact_vectors():
+        # Quantization is set on the compact vector only
+        vectors_config = {COMPACT_VECTOR_NAME: profile.vectors_config_diff(with_quantization=True)}
+        quantization_config = None
+    else:
+        vectors_config = {"": profile.vectors_config_diff()}
+        quantization_config = quantization_update(profile)
+
+    qdrant_client.update_collection(
+        collection_name=COLLECTION_NAME,
+        vectors_config=vectors_config,
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=quantization_config,
+    )
+    print("Updated, Qdrant is re-indexing in the background")
+
+
+def dense_vector(vector) -> list[float]:
+    # Collections created before hybrid search store a single unnamed vector
+    if not isinstance(vector, dict):
+        return vector
+    return vector[FULL_VECTOR_NAME] if FULL_VECTOR_NAME in vector else vector[""]
+
+
+def copy_collection(target: str, profile_name: str, dry_run: bool = False):
+    qdrant_client = get_qdrant_client()
+    total = qdrant_client.count(COLLECTION_NAME, exact=True).count
+    print(
+        f"Copying {total:,} points from '{COLLECTION_NAME}' to '{target}' "
+        f"(profile '{profile_name}', compact vectors {COMPACT_DIM or 'off'})"
+    )
+    if dry_run:
+        return
+
+    if qdrant_client.collection_exists(target):
+        raise SystemExit(f"'{target}' already exists")
+
+    create_collection(target, COLLECTION_PROFILES[profile_name])
+
+    started = time.perf_counter()
+    copied = 0
+    offset = None
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=COLLECTION_NAME,
+            limit=COPY_BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if not records:
+            break
+
+        qdrant_client.upsert(
+            collection_name=target,
+            points=[
+                PointStruct(
+                    id=record.id,
+                    vector=point_vectors(
+                        dense_vector(record.vector),
+                        record.payload.get("text", ""),
+                        sparse=True,
+                        compact=COMPACT_DIM,
+                    ),
+                    payload=record.payload,
+                )
+                for record in records
+            ],
+        )
+        copied += len(records)
+        print(f"  {copied:,}/{total:,}")
+
+        if offset is None:
+            break
+
+    print(f"Copied {copied:,} points in {time.perf_counter() - started:.1f}s")
+    print(f"Set QDRANT_COLLECTION={target} and restart, then drop '{COLLECTION_NAME}' when you're happy")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=list(COLLECTION_PROFILES), default=settings.QDRANT_PROFILE)
+    parser.add_argument("--copy-to", metavar="COLLECTION", help="copy into a new collection instead of updating in place")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.copy_to:
+        copy_collection(args.copy_to, args.profile, args.dry_run)
+    else:
+        migrate_in_place(args.profile, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
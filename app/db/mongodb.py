@@ -1,8 +1,12 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, AsyncMongoClient
 from app.config import settings
 
 client = MongoClient(settings.MONGODB_URI)
 db = client[settings.MONGODB_DB]
 
+# Used by the async request path (chat, conversations)
+async_client = AsyncMongoClient(settings.MONGODB_URI)
+async_db = async_client[settings.MONGODB_DB]
+
 documents_collection = db["documents"]
 
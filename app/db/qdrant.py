@@ -1,35 +1,214 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
-from app.core.embeddings import EMBEDDING_DIM
+import httpx
+from threading import Lock
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import Distance, VectorParams, HnswConfigDiff, SparseVectorParams, Modifier, PayloadSchemaType
+from app.config import settings
+from app.core.embeddings import EMBEDDING_DIM, COMPACT_DIM, compact_vector
+from app.core.bm25 import SPARSE_VECTOR_NAME, encode_document
+from app.db.collection_profiles import get_profile, profile_differences
 
 
-QDRANT_HOST = "localhost"
-QDRANT_PORT = 6333
+COLLECTION_NAME = settings.QDRANT_COLLECTION
+VECTOR_SIZE = EMBEDDING_DIM # declared by the embedding provider
 
-COLLECTION_NAME = "documents_embeddings"
-VECTOR_SIZE = EMBEDDING_DIM # OpenAI embedding dimension
+# Dense vector names when the collection stores a compact vector for the
+# HNSW search and the full one for re-scoring. Otherwise the full vector is
+# the collection's unnamed default vector ("").
+COMPACT_VECTOR_NAME = "compact"
+FULL_VECTOR_NAME = "full"
+
+# Quantization, on-disk storage and HNSW settings, see app/db/collection_profiles.py
+COLLECTION_PROFILE = get_profile(settings.QDRANT_PROFILE)
+
+# Shared, process-wide clients. Created at startup (or on first use) and
+# closed at shutdown, so requests reuse pooled keep-alive connections.
+_client: QdrantClient | None = None
+_async_client: AsyncQdrantClient | None = None
+_client_lock = Lock()
+
+# Payload fields searches filter on. Indexed so Qdrant can apply the filter
+# during HNSW traversal instead of scanning payloads.
+PAYLOAD_INDEXES = {
+    "file_id": PayloadSchemaType.KEYWORD,
+}
+
+# What the collection actually stores, read in create_collection_if_not_exists.
+# Points are written and searched to match the collection rather than the
+# settings, so an older collection keeps working until it's migrated.
+_sparse_available = True  # BM25 sparse vector (collections created before hybrid search don't have it)
+_compact_dim = COMPACT_DIM  # size of the compact vector, 0 = single full vector
+
+
+def _client_options() -> dict:
+    return {
+        "host": settings.QDRANT_HOST,
+        "port": settings.QDRANT_PORT,
+        "grpc_port": settings.QDRANT_GRPC_PORT,
+        "prefer_grpc": settings.QDRANT_PREFER_GRPC,
+        "timeout": settings.QDRANT_TIMEOUT,
+        # qdrant-client turns keep-alive off for localhost unless limits are given
+        "limits": httpx.Limits(
+            max_connections=settings.QDRANT_POOL_SIZE,
+            max_keepalive_connections=settings.QDRANT_POOL_SIZE,
+        ),
+    }
 
 
 def get_qdrant_client() -> QdrantClient:
-    return QdrantClient(
-        host=QDRANT_HOST,
-        port=QDRANT_PORT,
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = QdrantClient(**_client_options())
+    return _client
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncQdrantClient(**_client_options())
+    return _async_client
+
+
+def init_qdrant_clients():
+    get_qdrant_client()
+    get_async_qdrant_client()
+
+
+async def close_qdrant_clients():
+    global _client, _async_client
+    with _client_lock:
+        client, async_client = _client, _async_client
+        _client, _async_client = None, None
+
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.close()
+
+
+def has_sparse_vectors() -> bool:
+    return _sparse_available
+
+
+def compact_dim() -> int:
+    return _compact_dim
+
+
+def uses_compact_vectors() -> bool:
+    return _compact_dim > 0
+
+
+def point_vectors(dense: list[float], text: str, sparse: bool | None = None, compact: int | None = None):
+    if sparse is None:
+        sparse = has_sparse_vectors()
+    if compact is None:
+        compact = compact_dim()
+
+    if not sparse and not compact:
+        return dense
+
+    if compact:
+        vectors = {FULL_VECTOR_NAME: dense, COMPACT_VECTOR_NAME: compact_vector(dense, compact)}
+    else:
+        vectors = {"": dense}  # the collection's default vector
+
+    if sparse:
+        vectors[SPARSE_VECTOR_NAME] = encode_document(text)
+    return vectors
+
+
+def ensure_payload_indexes(collection_name: str = COLLECTION_NAME):
+    qdrant_client = get_qdrant_client()
+    existing = qdrant_client.get_collection(collection_name).payload_schema or {}
+
+    for field, schema in PAYLOAD_INDEXES.items():
+        if field not in existing:
+            qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=schema,
+                wait=True,
+            )
+
+
+def create_collection(collection_name: str, profile=COLLECTION_PROFILE, compact: int = COMPACT_DIM):
+    if compact:
+        # Only the compact vector gets an HNSW graph (and the profile's
+        # quantization). The full one is read from disk for the few
+        # candidates being re-scored.
+        vectors_config = {
+            COMPACT_VECTOR_NAME: profile.vectors_config(compact, with_quantization=True),
+            FULL_VECTOR_NAME: VectorParams(
+                size=VECTOR_SIZE,
+                distance=Distance.COSINE,
+                on_disk=True,
+                hnsw_config=HnswConfigDiff(m=0),
+            ),
+        }
+        quantization_config = None
+    else:
+        vectors_config = profile.vectors_config(VECTOR_SIZE)
+        quantization_config = profile.quantization_config()
+
+    get_qdrant_client().create_collection(
+        collection_name=collection_name,
+        vectors_config=vectors_config,
+        # BM25: documents store term frequencies, Qdrant applies IDF at query time
+        sparse_vectors_config={
+            SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF),
+        },
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=quantization_config,
     )
+    ensure_payload_indexes(collection_name)
+
+
+def detect_collection_layout(info):
+    """Record which vectors the existing collection stores."""
+    global _sparse_available, _compact_dim
+    _sparse_available = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+
+    vectors = info.config.params.vectors
+    compact = vectors.get(COMPACT_VECTOR_NAME) if isinstance(vectors, dict) else None
+    _compact_dim = compact.size if compact else 0
 
 
 def create_collection_if_not_exists():
+    global _sparse_available, _compact_dim
     qdrant_client = get_qdrant_client()
     collections = qdrant_client.get_collections().collections
     existing_names = {c.name for c in collections}
 
     if COLLECTION_NAME in existing_names:
-        return  # already exists
+        info = qdrant_client.get_collection(COLLECTION_NAME)
+        detect_collection_layout(info)
 
-    qdrant_client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(
-            size=VECTOR_SIZE,
-            distance=Distance.COSINE,
-        ),
-    )
+        migrate_hint = "(python -m app.db.migrate_collection --copy-to <new name>)"
+        if not _sparse_available:
+            print(
+                f"[QDRANT] '{COLLECTION_NAME}' has no '{SPARSE_VECTOR_NAME}' sparse vector, "
+                f"lexical and hybrid search fall back to dense until it is migrated {migrate_hint}"
+            )
+        if _compact_dim != COMPACT_DIM:
+            print(
+                f"[QDRANT] '{COLLECTION_NAME}' has compact vectors of size {_compact_dim}, "
+                f"EMBEDDING_COMPACT_DIM is {COMPACT_DIM}. Using the collection's layout "
+                f"until it is migrated {migrate_hint}"
+            )
+
+        differences = profile_differences(info, COLLECTION_PROFILE)
+        if differences:
+            print(
+                f"[QDRANT] '{COLLECTION_NAME}' doesn't match profile '{settings.QDRANT_PROFILE}' "
+                f"({', '.join(differences)}), run python -m app.db.migrate_collection"
+            )
+
+        ensure_payload_indexes()
+        return  # already exists
 
+    create_collection(COLLECTION_NAME)
+    _sparse_available = True
+    _compact_dim = COMPACT_DIM
@@ -0,0 +1,86 @@
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from app.config import settings
+from app.core.metrics import observe_upstream
+
+# Models that live in the sidecar when it is configured
+SIDECAR_MODELS = {"spacy", "sentiment"}
+
+
+class InferenceSidecarError(Exception):
+    pass
+
+
+_local = threading.local()
+
+
+def sidecar_enabled() -> bool:
+    return bool(settings.INFERENCE_SOCKET)
+
+
+def _authkey() -> bytes:
+    # The sidecar refuses to run without one
+    if not settings.INFERENCE_AUTHKEY:
+        raise InferenceSidecarError("INFERENCE_AUTHKEY must be set to use the inference sidecar")
+    return settings.INFERENCE_AUTHKEY.encode("utf-8")
+
+
+def _get_connection():
+    # One connection per calling thread, the sidecar serves each in its own thread
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = Client(settings.INFERENCE_SOCKET, family="AF_UNIX", authkey=_authkey())
+        _local.conn = conn
+    return conn
+
+
+def _drop_connection():
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+
+def call_sidecar(function: str, *args):
+    """
+    Run one of the sidecar's functions (see app.inference.server.FUNCTIONS).
+
+    :raises InferenceSidecarError: the sidecar is unreachable or the call failed
+    """
+    # Retry once on a fresh connection, e.g. after the sidecar restarted
+    for attempt in range(2):
+        try:
+            conn = _get_connection()
+            with observe_upstream("inference", function):
+                conn.send((function, args))
+                status, result = conn.recv()
+            break
+        except (OSError, EOFError, AuthenticationError) as e:
+            _drop_connection()
+            if attempt == 1:
+                raise InferenceSidecarError(f"Inference sidecar unavailable: {e}")
+
+    if status != "ok":
+        raise InferenceSidecarError(f"{function} failed in the inference sidecar: {result}")
+    return result
+
+
+def run_inference(function: str, in_process, *args):
+    """
+    Run `function` in the sidecar when one is configured, otherwise (or if it
+    can't be reached and INFERENCE_FALLBACK_LOCAL is set) call `in_process`.
+    """
+    if not sidecar_enabled():
+        return in_process(*args)
+
+    try:
+        return call_sidecar(function, *args)
+    except InferenceSidecarError as e:
+        if not settings.INFERENCE_FALLBACK_LOCAL:
+            raise
+        print(f"[INFERENCE] {e}, running {function} in-process")
+        return in_process(*args)
@@ -0,0 +1,113 @@
+"""
+Inference sidecar: hosts the spaCy and sentiment models once for every
+uvicorn worker on the machine, and runs them on its own process pool.
+
+    INFERENCE_SOCKET=/tmp/ai-support-inference.sock python -m app.inference.server
+
+Workers started with the same INFERENCE_SOCKET send detect_emotion and entity
+extraction calls here instead of loading the models themselves.
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+from dotenv import load_dotenv
+load_dotenv() # Load the environment variables
+
+from app.config import settings
+from app.core.model_registry import registry
+from app.services.sentiment_service import detect_emotions_in_process
+from app.services.entity_extractor import extract_entities_and_edges_in_process
+
+FUNCTIONS = {
+    "detect_emotions": detect_emotions_in_process,
+    "extract_entities_and_edges": extract_entities_and_edges_in_process,
+}
+
+
+def _init_worker():
+    # Load the models once per pool process, before the first request
+    if settings.INFERENCE_TORCH_THREADS:
+        import torch
+        torch.set_num_threads(settings.INFERENCE_TORCH_THREADS)
+
+    registry.get("spacy")
+    registry.get("sentiment")
+
+
+def _handle_connection(conn, pool: ProcessPoolExecutor):
+    with conn:
+        while True:
+            try:
+                function, args = conn.recv()
+            except (EOFError, OSError):
+                return  # client went away
+
+            try:
+                result = pool.submit(FUNCTIONS[function], *args).result()
+                reply = ("ok", result)
+            except Exception as e:
+                reply = ("error", f"{type(e).__name__}: {e}")
+
+            try:
+                conn.send(reply)
+            except OSError:
+                return
+
+
+def serve():
+    if not settings.INFERENCE_SOCKET:
+        raise SystemExit("INFERENCE_SOCKET must be set to run the inference sidecar")
+
+    # Requests are unpickled, so only authenticated clients may send them
+    if not settings.INFERENCE_AUTHKEY:
+        raise SystemExit(
+            "INFERENCE_AUTHKEY must be set to run the inference sidecar, "
+            "e.g. python -c \"import secrets; print(secrets.token_hex(32))\""
+        )
+
+    # A socket file left behind by a previous run blocks bind()
+    if os.path.exists(settings.INFERENCE_SOCKET):
+        os.remove(settings.INFERENCE_SOCKET)
+
+    pool = ProcessPoolExecutor(
+        max_workers=settings.INFERENCE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    # Socket file readable and writable by this user only, from the moment
+    # it is bound
+    previous_umask = os.umask(0o177)
+    try:
+        listener = Listener(
+            settings.INFERENCE_SOCKET,
+            family="AF_UNIX",
+            authkey=settings.INFERENCE_AUTHKEY.encode("utf-8"),
+        )
+    finally:
+        os.umask(previous_umask)
+    os.chmod(settings.INFERENCE_SOCKET, 0o600)
+    print(f"[INFERENCE] listening on {settings.INFERENCE_SOCKET} with {settings.INFERENCE_WORKERS} workers")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, AuthenticationError) as e:
+                print(f"[INFERENCE] rejected connection: {e}")
+                continue
+            threading.Thread(target=_handle_connection, args=(conn, pool), daemon=True).start()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        listener.close()
+        pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    serve()
@@ -5,6 +5,9 @@ from dotenv import load_dotenv
 load_dotenv() # Load the environment variables
 
 from app.config import settings
+from app.core.model_registry import registry
+from app.core.tracing import init_tracing, shutdown_tracing
+from app.inference.client import SIDECAR_MODELS, sidecar_enabled
 from app.middleware.logging import LoggingMiddleware
 from app.middleware.file_size_limit import LimitUploadSizeMiddleware
 from app.routers.health import router as health_router
@@ -13,7 +16,20 @@ from app.routers.qdrant_health import router as qdrant_health_router
 from app.routers.embeddings import router as embeddings_router
 from app.routers.search import router as search_router
 from app.routers.chat import router as chat_router
-from app.db.qdrant import create_collection_if_not_exists
+from app.routers.cache import router as cache_router
+from app.routers.jobs import router as jobs_router
+from app.routers.metrics import router as metrics_router
+from app.db.qdrant import (
+    create_collection_if_not_exists,
+    init_qdrant_clients,
+    close_qdrant_clients,
+)
+from app.db.indexes import ensure_indexes
+from app.services.pdf_service import shutdown_extraction_pool
+from app.services.ingestion_pipeline import (
+    start_ingestion_workers,
+    stop_ingestion_workers,
+)
 
 app = FastAPI(
     title="AI Support Agent",
@@ -21,12 +37,38 @@ app = FastAPI(
 )
 
 
-# -----------------
-# QDRANT COLLECTION
-# -----------------
+# ------------------
+# STARTUP / SHUTDOWN
+# ------------------
 @app.on_event("startup")
 def startup_event():
+    init_tracing()
+    init_qdrant_clients()
     create_collection_if_not_exists()
+    ensure_indexes()
+    start_ingestion_workers()
+
+    # Load models in the background, /ready reports when they're done.
+    # Models hosted by the inference sidecar aren't loaded in this worker.
+    if settings.MODEL_WARMUP:
+        names = registry.names()
+        if sidecar_enabled():
+            names = [name for name in names if name not in SIDECAR_MODELS]
+        registry.warm_up(names)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    stop_ingestion_workers()
+    shutdown_extraction_pool()
+    await close_qdrant_clients()
+    shutdown_tracing()
+
+
+# Middleware added last runs first: CORS wraps the upload limit so its 413s
+# carry the CORS headers too, and logging wraps everything so every request
+# is logged and timed, including ones rejected early
+app.add_middleware(LimitUploadSizeMiddleware, max_bytes=settings.MAX_UPLOAD_BYTES)
 
 
 # -----------
@@ -45,8 +87,6 @@ app.add_middleware(
 # LOGGING
 # -------
 app.add_middleware(LoggingMiddleware)
-app.add_middleware(LimitUploadSizeMiddleware)
-
 
 
 # -------
@@ -58,6 +98,9 @@ app.include_router(qdrant_health_router)
 app.include_router(embeddings_router)
 app.include_router(search_router)
 app.include_router(chat_router)
+app.include_router(cache_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
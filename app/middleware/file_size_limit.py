@@ -1,20 +1,71 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse
-from starlette import status
-
-MAX_UPLOAD_SIZE = 20 * 1024 * 1024  # 20MB
-
-class LimitUploadSizeMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > MAX_UPLOAD_SIZE:
-            response = JSONResponse(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                content={"detail": {"error": "20MB file upload limit exceeded"}},
-            )
-            # Add CORS headers manually
-            response.headers["Access-Control-Allow-Origin"] = "http://localhost:5173"
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            return response
-        return await call_next(request)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.core.errors import payload_too_large
+
+
+class LimitUploadSizeMiddleware:
+    """
+    Rejects request bodies over MAX_UPLOAD_BYTES with a 413.
+
+    Content-Length is checked up front, but the bytes are also counted as
+    they are received, so chunked uploads (no Content-Length) or a lying
+    header are cut off as soon as they pass the limit instead of being
+    read to the end.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int | None = None):
+        self.app = app
+        self.max_bytes = settings.MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+        if self.max_bytes >= 1024 * 1024:
+            self.message = f"{self.max_bytes // (1024 * 1024)}MB file upload limit exceeded"
+        else:
+            self.message = f"{self.max_bytes} byte file upload limit exceeded"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self.reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    # Re-raised by FastAPI's body parsing and turned into
+                    # the 413 by its exception handling
+                    raise payload_too_large(self.message)
+            return message
+
+        async def tracked_send(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except Exception:
+            # The app read the body outside FastAPI's handling, answer here
+            if not exceeded or response_started:
+                raise
+            await self.reject(scope, receive, send)
+
+    async def reject(self, scope: Scope, receive: Receive, send: Send):
+        # CORS headers are added by CORSMiddleware, which wraps this one
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": {"error": self.message}},
+        )
+        await response(scope, receive, send)
@@ -1,18 +1,48 @@
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.core.metrics import HTTP_REQUEST_SECONDS
+from app.core.tracing import start_span
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
 
-        response = await call_next(request)
+def route_template(scope: Scope) -> str:
+    # "/chat/{conversation_id}" rather than the raw path, so metric labels
+    # stay bounded. Unmatched paths are grouped together.
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
 
-        duration = (time.time() - start_time) * 1000  # ms
 
-        method = request.method
-        path = request.url.path
+class LoggingMiddleware:
+    """
+    Plain ASGI middleware, so streaming responses pass straight through and
+    the recorded duration covers the whole response, not just the headers.
+    """
 
-        print(f"[LOG] {method} {path} completed in {duration:.2f} ms")
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            with start_span(f"{scope['method']} {scope['path']}"):
+                await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start_time
+
+            if settings.METRICS_ENABLED:
+                HTTP_REQUEST_SECONDS.labels(scope["method"], route_template(scope), status).observe(duration)
+
+            if settings.REQUEST_LOGGING:
+                print(f"[LOG] {scope['method']} {scope['path']} completed in {duration * 1000:.2f} ms")
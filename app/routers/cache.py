@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from app.services.embedding_cache import get_cache_stats as get_embedding_cache_stats
+from app.services.answer_cache import get_answer_cache_stats
+from app.services.search_service import get_query_embedding_cache_stats
+from app.services.conversation_service import get_conversation_cache_stats
+
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/stats")
+def cache_stats():
+    return {
+        "embeddings": get_embedding_cache_stats(),
+        "queries": get_query_embedding_cache_stats(),
+        "answers": get_answer_cache_stats(),
+        "conversations": get_conversation_cache_stats(),
+    }
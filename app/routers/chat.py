@@ -1,25 +1,36 @@
+import json
+import asyncio
+from dataclasses import dataclass
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 
+from app.config import settings
 from app.core.errors import file_not_found
-from app.services.search_service import search_similar_chunks
+from app.core.metrics import timed_stage
+from app.services.search_service import embed_query, search_with_embedding
+from app.services.answer_cache import answer_cache
+from app.services.corpus_version import get_corpus_version
 from app.services.chat_service import (
     rewrite_query,
     generate_answer,
+    stream_answer,
 )
 from app.services.conversation_service import (
+    start_conversation,
     create_conversation,
     get_conversation,
-    add_message,
+    get_recent_messages,
+    build_message,
+    add_messages,
     get_latest_conversation,
     list_conversations,
     rename_conversation_by_id,
     delete_conversation_by_id,
 )
-from app.services.report_generator import generate_report_pdf
-from app.services.sentiment_service import detect_emotion
+from app.services.sentiment_service import detect_emotion_async
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -28,53 +39,205 @@ class ChatRequest(BaseModel):
     question: str
     top_k: int = 5
     conversation_id: Optional[str] = None
+    file_ids: Optional[list[str]] = None  # only answer from these documents
 
 
-@router.post("")
-def chat(request: ChatRequest):
-    # 1. Create or reuse conversation
-    conversation_id = request.conversation_id
-    if not conversation_id:
-        conversation_id = create_conversation()
-
-    # 2. Load previous messages
-    convo = get_conversation(conversation_id)
-    previous_messages = convo["messages"]
-
-    # 3. Vector search
-    search_results = search_similar_chunks(
+async def load_conversation(request: ChatRequest) -> tuple[str, list[dict]]:
+    # 1. Start a conversation (stored along with its first messages) or reuse one
+    if not request.conversation_id:
+        return start_conversation(), []
+
+    # 2. Load previous messages, usually from the conversation cache
+    messages = await get_recent_messages(request.conversation_id)
+    if messages is None:
+        raise file_not_found("Conversation not found")
+    return request.conversation_id, messages
+
+
+@dataclass
+class PreparedChat:
+    conversation_id: str
+    previous_messages: list[dict]
+    emotion: str
+    query_embedding: list[float]
+    corpus_version: int | None
+    context_chunks: list[str]
+    cached: dict | None = None
+
+    @property
+    def chunks_used(self) -> int:
+        return self.cached["chunks_used"] if self.cached else len(self.context_chunks)
+
+
+async def cached_corpus_version(request: ChatRequest) -> int | None:
+    # Only first-turn answers are cached, follow-ups skip the read
+    if not settings.ANSWER_CACHE_ENABLED or request.conversation_id:
+        return None
+    return await get_corpus_version()
+
+
+async def prepare_chat(request: ChatRequest) -> PreparedChat:
+    # Loading the conversation, embedding the question and emotion detection
+    # don't depend on each other, so run them concurrently
+    (conversation_id, previous_messages), query_embedding, emotion, corpus_version = await asyncio.gather(
+        timed_stage("chat", "load_conversation", load_conversation(request)),
+        timed_stage("chat", "embed_query", embed_query(request.question)),
+        # Detect emotion (micro-batched with other in-flight requests)
+        timed_stage("chat", "detect_emotion", detect_emotion_async(request.question)),
+        timed_stage("chat", "corpus_version", cached_corpus_version(request)),
+    )
+    chat = PreparedChat(conversation_id, previous_messages, emotion, query_embedding, corpus_version, [])
+
+    # A first-turn question doesn't depend on any history, so an earlier
+    # answer to a near-identical question can be reused as is
+    if corpus_version is not None and not previous_messages:
+        chat.cached = answer_cache.lookup(query_embedding, request.top_k, corpus_version, request.file_ids)
+        if chat.cached:
+            return chat
+
+    # Vector search (dense, keyword or hybrid per SEARCH_MODE)
+    search_results = await timed_stage("chat", "search", search_with_embedding(
         request.question,
+        query_embedding,
         top_k=request.top_k,
-    )
-    context_chunks = [r["text"] for r in search_results]
+        file_ids=request.file_ids,
+    ))
+    chat.context_chunks = [r["text"] for r in search_results]
 
-    # 4. Generate answer
-    answer = generate_answer(
-        question=request.question,
-        previous_messages=previous_messages,
-        context_chunks=context_chunks,
-    )
+    return chat
 
-    # 5. Detect emotion
-    emotion = detect_emotion(request.question)
 
-    # 6. Store new messages
-    add_message(conversation_id, "user", request.question, emotion)
-    add_message(conversation_id, "assistant", answer)
+def cache_answer(request: ChatRequest, chat: PreparedChat, answer: str):
+    if chat.corpus_version is not None and not chat.previous_messages and not chat.cached and answer:
+        answer_cache.store(
+            chat.query_embedding,
+            request.top_k,
+            chat.corpus_version,
+            answer,
+            len(chat.context_chunks),
+            request.file_ids,
+        )
 
-    # 7. Return response
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("")
+async def chat(request: ChatRequest):
+    chat = await prepare_chat(request)
+
+    # Generate answer
+    if chat.cached:
+        answer = chat.cached["answer"]
+    else:
+        answer = await timed_stage("chat", "generate", generate_answer(
+            question=request.question,
+            previous_messages=chat.previous_messages,
+            context_chunks=chat.context_chunks,
+        ))
+        cache_answer(request, chat, answer)
+
+    # Store the question and answer in one write
+    await timed_stage("chat", "store_messages", add_messages(chat.conversation_id, [
+        build_message("user", request.question, chat.emotion),
+        build_message("assistant", answer),
+    ]))
+
+    # Return response
     return {
-        "conversation_id": conversation_id,
+        "conversation_id": chat.conversation_id,
         "question": request.question,
         "answer": answer,
-        "chunks_used": len(context_chunks),
-        "user_emotion": emotion,
+        "chunks_used": chat.chunks_used,
+        "user_emotion": chat.emotion,
+        "cached": chat.cached is not None,
     }
 
 
+@router.post("/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Server-sent events variant of POST /chat.
+
+    Emits a `meta` event (conversation_id, chunks_used, user_emotion), then a
+    `token` event per piece of the answer, then `done` (or `error`). A cached
+    answer is sent as a single `token` event.
+    """
+    chat = await prepare_chat(request)
+
+    async def store_messages(answer: str, completed: bool):
+        # Messages are always stored as (user, assistant) pairs, the report
+        # and the prompt history rely on that. With no answer at all nothing
+        # is stored, like POST /chat on an error, but a new conversation
+        # still gets its document: the client has its id from `meta`.
+        if not answer:
+            if not request.conversation_id:
+                await create_conversation(chat.conversation_id)
+            return
+
+        reply = build_message("assistant", answer)
+        if not completed:
+            reply["status"] = "partial"  # the stream failed or was cut off
+        await add_messages(chat.conversation_id, [
+            build_message("user", request.question, chat.emotion),
+            reply,
+        ])
+
+    async def answer_tokens():
+        if chat.cached:
+            yield chat.cached["answer"]
+            return
+
+        async for token in stream_answer(
+            question=request.question,
+            previous_messages=chat.previous_messages,
+            context_chunks=chat.context_chunks,
+        ):
+            yield token
+
+    async def event_stream():
+        yield sse_event("meta", {
+            "conversation_id": chat.conversation_id,
+            "question": request.question,
+            "chunks_used": chat.chunks_used,
+            "user_emotion": chat.emotion,
+            "cached": chat.cached is not None,
+        })
+
+        answer_parts = []
+        completed = False
+        try:
+            async for token in answer_tokens():
+                answer_parts.append(token)
+                yield sse_event("token", {"content": token})
+            completed = True
+
+            # Only complete answers are cached
+            cache_answer(request, chat, "".join(answer_parts))
+            yield sse_event("done", {"conversation_id": chat.conversation_id})
+
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+        finally:
+            # Runs once the stream closes. Shielded so the write still goes
+            # through when the client disconnects and the stream is cancelled.
+            await asyncio.shield(timed_stage("chat", "store_messages", store_messages("".join(answer_parts), completed)))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # don't let a reverse proxy buffer the stream
+        },
+    )
+
+
 @router.get("/latest")
-def get_latest_chat():
-    conversation = get_latest_conversation()
+async def get_latest_chat():
+    conversation = await get_latest_conversation()
 
     if not conversation:
         return {
@@ -89,8 +252,8 @@ def get_latest_chat():
 
 
 @router.get("/conversations")
-def get_conversations():
-    convs = list_conversations()
+async def get_conversations():
+    convs = await list_conversations()
     return [
         {
             "conversation_id": str(c["conversation_id"]),
@@ -101,8 +264,8 @@ def get_conversations():
 
 
 @router.get("/{conversation_id}")
-def get_conversation_messages(conversation_id: str):
-    convo = get_conversation(conversation_id)
+async def get_conversation_messages(conversation_id: str):
+    convo = await get_conversation(conversation_id, message_limit=None)
 
     if not convo:
         raise file_not_found("Conversation not found")
@@ -115,7 +278,7 @@ def get_conversation_messages(conversation_id: str):
 
 @router.patch("/{conversation_id}/rename")
 async def rename_conversation(conversation_id: str, new_title: str):
-    result = rename_conversation_by_id(conversation_id, new_title)
+    result = await rename_conversation_by_id(conversation_id, new_title)
 
     if result.matched_count == 0:
         raise file_not_found("Conversation not found")
@@ -125,7 +288,7 @@ async def rename_conversation(conversation_id: str, new_title: str):
 
 @router.delete("/{conversation_id}")
 async def delete_conversation(conversation_id: str):
-    result = delete_conversation_by_id(conversation_id)
+    result = await delete_conversation_by_id(conversation_id)
 
     if result.deleted_count == 0:
         raise file_not_found("Conversation not found")
@@ -134,14 +297,17 @@ async def delete_conversation(conversation_id: str):
 
 
 @router.get("/{conversation_id}/report")
-def generate_report(conversation_id: str):
-    conversation = get_conversation(conversation_id)
+async def generate_report(conversation_id: str):
+    # reportlab is only needed here, keep it out of app startup
+    from app.services.report_generator import generate_report_pdf
+
+    conversation = await get_conversation(conversation_id, message_limit=None)
 
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     output_path = f"reports/{conversation_id}.pdf"
-    generate_report_pdf(conversation, output_path)
+    await run_in_threadpool(generate_report_pdf, conversation, output_path)
 
     return FileResponse(
         output_path,
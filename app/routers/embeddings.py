@@ -11,10 +11,10 @@ def generate_embeddings(file_id: str):
     if not text:
         raise HTTPException(status_code=404, detail="No extracted text found")
 
-    count = embed_and_store(file_id, text)
+    result = embed_and_store(file_id, text)
 
     return {
         "file_id": file_id,
-        "chunks_embedded": count
+        **result,
     }
 
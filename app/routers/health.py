@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 import fastapi
 import datetime
+from app.core.model_registry import registry
 
 router = APIRouter()
 
@@ -11,3 +12,17 @@ async def health():
         "Timestamp": datetime.datetime.now()
     }
 
+
+@router.get("/ready")
+async def ready(response: Response):
+    models = registry.status()
+    is_ready = not registry.warming_up and not any(m["error"] for m in models.values())
+
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {
+        "ready": is_ready,
+        "models": models,
+    }
+
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from typing import Optional
+from app.core.errors import file_not_found
+from app.services.job_repository import get_job, list_jobs
+
+
+router = APIRouter(prefix="/jobs", tags=["Ingestion Jobs"])
+
+
+@router.get("")
+def get_jobs(file_id: Optional[str] = None, limit: int = 20):
+    return list_jobs(file_id, limit)
+
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str):
+    job = get_job(job_id)
+
+    if not job:
+        raise file_not_found("Job not found")
+
+    return job
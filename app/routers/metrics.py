@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+def metrics():
+    # Prometheus text format
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
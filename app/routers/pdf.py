@@ -1,8 +1,14 @@
+import os
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from pathlib import Path
+from pymongo.errors import DuplicateKeyError
+from typing import Optional
+from app.config import settings
+from app.core.errors import bad_request, duplicate_file
 from app.services.file_storage import save_pdf, get_pdf_path
-from app.services.pdf_service import extract_text_from_pdf, PDFExtractionError
+from app.services.pdf_service import extract_text_and_pages, PDFExtractionError, ENGINES
 from app.services.embedding_service import embed_and_store
+from app.services.ingestion_pipeline import enqueue_ingestion
 from app.services.document_repository import (
     create_document,
     store_extracted_text,
@@ -13,21 +19,31 @@ from app.services.document_repository import (
     update_embed_status,
     store_extracted_entities,
 )
-from app.services.entity_extractor import (
-    extract_entities,
-    extract_sentence_entity_edges,
-)
+from app.services.entity_extractor import extract_entities_and_edges
 
 
 router = APIRouter(prefix="/pdf", tags=["PDF"])
 
 
 @router.post("/upload")
-async def upload_pdf(file: UploadFile = File(...)):
+def upload_pdf(
+    file: UploadFile = File(...),
+    ingest: Optional[bool] = None,
+    engine: Optional[str] = None,
+):
+    if engine and engine not in ENGINES:
+        raise bad_request(f"Unknown extraction engine, expected one of {', '.join(ENGINES)}.")
+
     metadata = save_pdf(file)
-    document = create_document(metadata)
+    metadata["extraction_engine"] = engine
+    try:
+        document = create_document(metadata)
+    except DuplicateKeyError:
+        # The same PDF uploaded concurrently got past the file_hash check
+        os.remove(metadata["path"])
+        raise duplicate_file("This PDF has already been uploaded.")
 
-    return {
+    response = {
         # "message": "PDF uploaded successfully",
         # "metadata": metadata,
         "file_id": document["file_id"],
@@ -35,9 +51,33 @@ async def upload_pdf(file: UploadFile = File(...)):
         "status": document["status"]
     }
 
+    # Hand extract -> entities -> chunk -> embed to the background workers
+    if ingest is None:
+        ingest = settings.INGESTION_ON_UPLOAD
+
+    if ingest:
+        job = enqueue_ingestion(document["file_id"])
+        response["job_id"] = job["job_id"]
+
+    return response
+
+
+@router.post("/ingest/{file_id}")
+def ingest_pdf(file_id: str):
+    if not get_document_by_file_id(file_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    job = enqueue_ingestion(file_id)
+
+    return {
+        "file_id": file_id,
+        "job_id": job["job_id"],
+        "status": job["status"],
+    }
+
 
 @router.post("/extract/{file_id}")
-def extract_pdf_text(file_id: str):
+def extract_pdf_text(file_id: str, engine: Optional[str] = None):
     document = get_document_by_file_id(file_id)
 
     if not document:
@@ -51,13 +91,13 @@ def extract_pdf_text(file_id: str):
 
     try:
         pdf_path = Path(get_pdf_path(file_id))
-        text = extract_text_from_pdf(pdf_path)
-
-        store_extracted_text(file_id, text)  # MongoDB
+        # Per-request engine, else the one chosen at upload, else the configured default
+        engine = engine or document.get("extraction_engine")
+        text, page_offsets = extract_text_and_pages(pdf_path, engine)
 
-        entities = extract_entities(text)
+        store_extracted_text(file_id, text, page_offsets)  # MongoDB
 
-        entity_edges = extract_sentence_entity_edges(text)
+        entities, entity_edges = extract_entities_and_edges(text)
 
         store_extracted_entities(file_id, entities, entity_edges)  # MongoDB
 
@@ -77,21 +117,21 @@ def generate_embeddings(file_id: str):
     if not text:
         raise HTTPException(status_code=404, detail="No extracted text found")
 
-    count = embed_and_store(file_id, text)
+    result = embed_and_store(file_id, text)
     
-    update_embed_status(file_id, count)
+    update_embed_status(file_id, result["chunks_embedded"])
 
     return {
         "file_id": file_id,
-        "chunks_embedded": count
+        **result,
     }
 
 
 @router.get("/list")
-async def list_pdfs():
+def list_pdfs():
     return list_all_pdfs()
 
 
 @router.delete("/{file_id}")
-async def delete_pdf(file_id: str):
+def delete_pdf(file_id: str):
     return delete_pdf_by_file_id(file_id)
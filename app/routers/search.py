@@ -1,18 +1,26 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from app.services.search_service import search_similar_chunks
 
 router = APIRouter(prefix="/search", tags=["Vector Search"])
 
 
 @router.post("/")
-def vector_search(query: str, top_k: int = 5):
+async def vector_search(
+    query: str,
+    top_k: int = 5,
+    mode: Optional[str] = None,
+    file_ids: Optional[list[str]] = Query(None),
+):
+    # mode: dense | sparse | hybrid, defaults to SEARCH_MODE
+    # file_ids: only search these documents (?file_ids=a&file_ids=b)
     try:
-        results = search_similar_chunks(query, top_k)
+        results = await search_similar_chunks(query, top_k, mode, file_ids)
         return {
             "query": query,
             "top_k": top_k,
+            "file_ids": file_ids,
             "results": results
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-
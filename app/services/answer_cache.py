@@ -0,0 +1,170 @@
+import uuid
+import threading
+import numpy as np
+
+from app.config import settings
+from app.core.ttl_cache import TTLCache
+
+
+class SemanticAnswerCache:
+    """
+    Answers to first-turn chat questions, looked up by embedding similarity
+    rather than exact text, so rephrasings of the same question ("how do I
+    reset my password", "password reset?") reuse one completion.
+
+    An entry only matches a question asked with the same top_k and file_ids
+    filter against the same corpus version, see app.services.corpus_version.
+
+    Entries (answers, LRU order and TTL) live in a TTLCache. Their vectors are
+    also kept stacked in one matrix per (top_k, file_ids) group, so a lookup
+    is a single matrix-vector product. Rows of evicted or expired entries are
+    skipped on lookup and compacted away on store.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, ttl_seconds: float):
+        self.threshold = threshold
+        self._entries = TTLCache(max_entries, ttl_seconds)
+        self._groups: dict[tuple, dict] = {}  # (top_k, scope) -> {"version", "keys", "matrix"}
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "stale": 0}
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+
+    @staticmethod
+    def _normalize(vector: list[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _scope(file_ids: list[str] | None) -> tuple[str, ...]:
+        return tuple(sorted(set(file_ids or ())))
+
+    def _drop_group(self, group_key: tuple) -> int:
+        # Caller holds _index_lock
+        group = self._groups.pop(group_key)
+        self._rows -= len(group["keys"])
+        # Number of live entries dropped
+        return sum(self._entries.pop(key) is not None for key in group["keys"])
+
+    def lookup(self, embedding: list[float], top_k: int, corpus_version: int, file_ids: list[str] | None = None) -> dict | None:
+        group_key = (top_k, self._scope(file_ids))
+
+        with self._index_lock:
+            group = self._groups.get(group_key)
+            if group is not None and group["version"] != corpus_version:
+                # The documents changed since these answers were generated
+                self._count("stale", self._drop_group(group_key))
+                group = None
+
+            if group is None:
+                self._count("misses")
+                return None
+
+            keys = list(group["keys"])
+            scores = group["matrix"] @ self._normalize(embedding)
+
+        # Best first, skipping rows whose entry was evicted or expired
+        for idx in np.argsort(scores)[::-1]:
+            score = float(scores[idx])
+            if score < self.threshold:
+                break
+
+            entry = self._entries.get(keys[idx])
+            if entry is not None:
+                self._count("hits")
+                return {
+                    "answer": entry["answer"],
+                    "chunks_used": entry["chunks_used"],
+                    "similarity": round(score, 4),
+                }
+
+        self._count("misses")
+        return None
+
+    def store(
+        self,
+        embedding: list[float],
+        top_k: int,
+        corpus_version: int,
+        answer: str,
+        chunks_used: int,
+        file_ids: list[str] | None = None,
+    ):
+        group_key = (top_k, self._scope(file_ids))
+        key = uuid.uuid4().hex
+        vector = self._normalize(embedding)
+
+        with self._index_lock:
+            group = self._groups.get(group_key)
+            if group is not None and group["version"] > corpus_version:
+                return  # generated against an older corpus, already stale
+            if group is not None and group["version"] < corpus_version:
+                self._count("stale", self._drop_group(group_key))
+                group = None
+
+            if group is None:
+                group = {"version": corpus_version, "keys": [], "matrix": np.empty((0, len(vector)), dtype=np.float32)}
+                self._groups[group_key] = group
+
+            self._entries.set(key, {"answer": answer, "chunks_used": chunks_used})
+            group["keys"].append(key)
+            group["matrix"] = np.vstack([group["matrix"], vector[np.newaxis]])
+            self._rows += 1
+
+            # Rows of evicted/expired entries pile up, prune them once they
+            # outnumber the live ones
+            if self._rows > 2 * self._entries.max_entries:
+                self._compact()
+
+        self._count("stores")
+
+    def _compact(self):
+        # Caller holds _index_lock
+        live = {key for key, _ in self._entries.items()}
+        self._rows = 0
+        for group_key, group in list(self._groups.items()):
+            keep = [idx for idx, key in enumerate(group["keys"]) if key in live]
+            if not keep:
+                del self._groups[group_key]
+                continue
+            group["keys"] = [group["keys"][idx] for idx in keep]
+            group["matrix"] = group["matrix"][keep]
+            self._rows += len(keep)
+
+    def clear(self):
+        with self._index_lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._rows = 0
+
+    def stats(self) -> dict:
+        entries = self._entries.stats()
+        with self._lock:
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = entries["entries"]
+        stats["evictions"] = entries["evictions"]
+        stats["expirations"] = entries["expirations"]
+        stats["enabled"] = settings.ANSWER_CACHE_ENABLED
+        stats["threshold"] = self.threshold
+        stats["max_entries"] = entries["max_entries"]
+        stats["ttl_seconds"] = entries["ttl_seconds"]
+        return stats
+
+
+answer_cache = SemanticAnswerCache(
+    threshold=settings.ANSWER_CACHE_THRESHOLD,
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+)
+
+
+def get_answer_cache_stats() -> dict:
+    return answer_cache.stats()
@@ -1,9 +1,11 @@
-from openai import OpenAI
-
-client = OpenAI()
+from typing import AsyncIterator
+from app.core.openai_clients import get_async_openai_client
+from app.core.metrics import observe_upstream
 
 MODEL = "gpt-4o-mini"
 
+NO_CONTEXT_ANSWER = "I do not know based on the provided documents."
+
 
 # SYSTEM_PROMPT = (
 #     "You are an AI assistant answering questions based on the provided context from a document. "
@@ -21,7 +23,7 @@ SYSTEM_PROMPT = (
 )
 
 
-def rewrite_query(question: str, previous_messages: list[dict]) -> str:
+async def rewrite_query(question: str, previous_messages: list[dict]) -> str:
     if not previous_messages:
         return question
 
@@ -82,19 +84,17 @@ def rewrite_query(question: str, previous_messages: list[dict]) -> str:
     })
 
     # generate the rewritten query with the message history context
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-        temperature=0,      # Zero-temperature rewriting
-    )
+    with observe_upstream("openai", "rewrite_query"):
+        response = await get_async_openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0,      # Zero-temperature rewriting
+        )
 
     return response.choices[0].message.content.strip()
 
 
-def generate_answer(question: str, previous_messages: list[dict], context_chunks: list[str]) -> str:
-    if not context_chunks:
-        return "I do not know based on the provided documents."
-
+def build_answer_messages(question: str, previous_messages: list[dict], context_chunks: list[str]) -> list[dict]:
     context = "\n\n---\n\n".join(context_chunks)
 
     messages = [
@@ -123,11 +123,44 @@ def generate_answer(question: str, previous_messages: list[dict], context_chunks
         "content": question
     })
 
-    response = client.chat.completions.create(
-        model=MODEL,
-        messages=messages,
-        temperature=0.2,  # lower = less creative, more factual
-    )
+    return messages
+
+
+async def generate_answer(question: str, previous_messages: list[dict], context_chunks: list[str]) -> str:
+    if not context_chunks:
+        return NO_CONTEXT_ANSWER
+
+    messages = build_answer_messages(question, previous_messages, context_chunks)
+
+    with observe_upstream("openai", "chat_completion"):
+        response = await get_async_openai_client().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            temperature=0.2,  # lower = less creative, more factual
+        )
 
     return response.choices[0].message.content
 
+
+async def stream_answer(question: str, previous_messages: list[dict], context_chunks: list[str]) -> AsyncIterator[str]:
+    """
+    Same as generate_answer, but yields the answer in pieces as the model produces them.
+    """
+    if not context_chunks:
+        yield NO_CONTEXT_ANSWER
+        return
+
+    messages = build_answer_messages(question, previous_messages, context_chunks)
+
+    # Timed until the last token
+    with observe_upstream("openai", "chat_completion_stream"):
+        stream = await get_async_openai_client().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            temperature=0.2,  # lower = less creative, more factual
+            stream=True,
+        )
+
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
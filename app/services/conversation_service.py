@@ -1,34 +1,147 @@
+import asyncio
 from fastapi import HTTPException
 from datetime import datetime
 from uuid import uuid4
-from app.db.mongodb import db
+from pymongo import DESCENDING, ReturnDocument
+from app.config import settings
+from app.db.mongodb import async_db
+from app.core.metrics import timed_upstream
+from app.core.ttl_cache import TTLCache
 
-MAX_MESSAGES = 10  # keep last N messages total
+MAX_MESSAGES = 10  # keep last N messages total (embedded), read last N (collection)
 
+MESSAGE_STORES = ("embedded", "collection")
+if settings.MESSAGE_STORE not in MESSAGE_STORES:
+    raise ValueError(f"Unknown MESSAGE_STORE '{settings.MESSAGE_STORE}', expected one of {', '.join(MESSAGE_STORES)}")
 
+# Recent message window per conversation: {"version": int, "messages": [...]}.
+# Every write to a conversation's messages bumps its "version" field, so an
+# entry is only extended when it was current before the write, and can be
+# checked against Mongo with a version-only read.
+conversation_cache = TTLCache(
+    max_entries=settings.CONVERSATION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CONVERSATION_CACHE_TTL_SECONDS,
+)
+_stats = {"stale": 0}
 
-def create_conversation() -> str:
+
+def message_collection_enabled() -> bool:
+    return settings.MESSAGE_STORE == "collection"
+
+
+@timed_upstream("mongodb")
+async def get_messages(conversation_id: str, limit: int | None = MAX_MESSAGES) -> list[dict]:
+    # Newest first off the (conversation_id, ts, _id) index, so the cost
+    # depends on the limit, not on how long the conversation is
+    cursor = async_db.messages.find(
+        {"conversation_id": conversation_id},
+        {"_id": 0, "conversation_id": 0},
+    ).sort([("ts", DESCENDING), ("_id", DESCENDING)])
+    if limit is not None:
+        cursor = cursor.limit(limit)
+
+    messages = await cursor.to_list()
+    for message in messages:
+        message["timestamp"] = message.pop("ts")
+    return messages[::-1]
+
+
+def attach_messages(convo: dict | None, messages: list[dict], limit: int | None) -> dict | None:
+    if convo is None:
+        return None
+    # Messages embedded before MESSAGE_STORE=collection are older than any
+    # in the collection
+    messages = convo.get("messages", []) + messages
+    convo["messages"] = messages[-limit:] if limit is not None else messages
+    return convo
+
+
+def start_conversation() -> str:
+    """
+    New conversation id without a round trip, the document is created by
+    the first add_messages.
+    """
     conversation_id = str(uuid4())
-    db.conversations.insert_one({
-        "conversation_id": conversation_id,
-        "title": "New chat",
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
-        "messages": [],
-    })
+    if settings.CONVERSATION_CACHE_ENABLED:
+        conversation_cache.set(conversation_id, {"version": 0, "messages": []})
     return conversation_id
 
 
-def get_conversation(conversation_id: str) -> list[dict]:
-    convo = db.conversations.find_one(
+@timed_upstream("mongodb")
+async def create_conversation(conversation_id: str):
+    """
+    Create a started conversation's document without any messages, for a
+    first turn that ends before an answer is stored. A no-op if it exists.
+    """
+    now = datetime.utcnow()
+    await async_db.conversations.update_one(
+        {"conversation_id": conversation_id},
+        {"$setOnInsert": {"title": "New chat", "created_at": now, "updated_at": now, "version": 0, "messages": []}},
+        upsert=True,
+    )
+
+
+@timed_upstream("mongodb")
+async def get_conversation(conversation_id: str, message_limit: int | None = MAX_MESSAGES) -> dict | None:
+    """
+    Conversation with its messages, oldest first. With MESSAGE_STORE=collection
+    only the latest ``message_limit`` are read (``None`` for the full history).
+    """
+    find_convo = async_db.conversations.find_one(
         {"conversation_id": conversation_id},
         {"_id": 0} # include everything except MongoDB _id
     )
-    # return convo["messages"] if convo else []
-    return convo # could be None if not found
 
+    if not message_collection_enabled():
+        return await find_convo # could be None if not found
+
+    convo, messages = await asyncio.gather(find_convo, get_messages(conversation_id, message_limit))
+    return attach_messages(convo, messages, message_limit)
+
+
+@timed_upstream("mongodb")
+async def get_conversation_version(conversation_id: str) -> int | None:
+    convo = await async_db.conversations.find_one(
+        {"conversation_id": conversation_id},
+        {"_id": 0, "version": 1},
+    )
+    return None if convo is None else convo.get("version", 0)
+
+
+async def get_recent_messages(conversation_id: str) -> list[dict] | None:
+    """
+    The last MAX_MESSAGES messages of a conversation (None if it doesn't
+    exist), served from the conversation cache when possible.
+
+    With CONVERSATION_CACHE_VERIFY a cached window is only used if its version
+    still matches Mongo, so turns written by other workers are never missed.
+    """
+    if settings.CONVERSATION_CACHE_ENABLED:
+        cached = conversation_cache.get(conversation_id)
+        if cached is not None:
+            if not settings.CONVERSATION_CACHE_VERIFY:
+                return list(cached["messages"])
+
+            version = await get_conversation_version(conversation_id)
+            if version == cached["version"]:
+                return list(cached["messages"])
+
+            conversation_cache.pop(conversation_id)
+            _stats["stale"] += 1
+            if version is None:
+                return None  # deleted by another worker
 
-def add_message(conversation_id: str, role: str, content: str, emotion: str | None = None):
+    convo = await get_conversation(conversation_id)
+    if convo is None:
+        return None
+
+    messages = convo["messages"][-MAX_MESSAGES:]
+    if settings.CONVERSATION_CACHE_ENABLED:
+        conversation_cache.set(conversation_id, {"version": convo.get("version", 0), "messages": messages})
+    return list(messages)
+
+
+def build_message(role: str, content: str, emotion: str | None = None) -> dict:
     message = {
         "role": role,
         "timestamp": datetime.utcnow(),
@@ -38,31 +151,95 @@ def add_message(conversation_id: str, role: str, content: str, emotion: str | No
     if emotion:
         message["emotion"] = emotion
 
-    db.conversations.update_one(
-        {"conversation_id": conversation_id},
-        {
-            "$push": {
-                "messages": {
-                    "$each": [message],
-                    "$slice": -MAX_MESSAGES,
-                }
-            },
-            "$set": {"updated_at": datetime.utcnow()},
-        },
-        upsert=True,
-    )
+    return message
 
 
-def get_latest_conversation():
-    return db.conversations.find_one(
+@timed_upstream("mongodb")
+async def add_messages(conversation_id: str, messages: list[dict]):
+    """
+    Append messages (from build_message) to a conversation in a single write,
+    creating the conversation if it doesn't exist yet.
+    """
+    now = datetime.utcnow()
+    update = {
+        "$set": {"updated_at": now},
+        "$inc": {"version": 1},
+        "$setOnInsert": {"title": "New chat", "created_at": now},
+    }
+
+    if message_collection_enabled():
+        stored = [
+            {"conversation_id": conversation_id, "ts": m["timestamp"], **{k: v for k, v in m.items() if k != "timestamp"}}
+            for m in messages
+        ]
+        convo, _ = await asyncio.gather(
+            async_db.conversations.find_one_and_update(
+                {"conversation_id": conversation_id},
+                update,
+                projection={"_id": 0, "version": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            ),
+            async_db.messages.insert_many(stored),
+        )
+    else:
+        update["$push"] = {
+            "messages": {
+                "$each": messages,
+                "$slice": -MAX_MESSAGES,
+            }
+        }
+        convo = await async_db.conversations.find_one_and_update(
+            {"conversation_id": conversation_id},
+            update,
+            projection={"_id": 0, "version": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    update_cached_messages(conversation_id, convo["version"], messages)
+
+
+def update_cached_messages(conversation_id: str, version: int, messages: list[dict]):
+    if not settings.CONVERSATION_CACHE_ENABLED:
+        return
+
+    cached = conversation_cache.pop(conversation_id)
+
+    # Only extend the window if no other worker wrote in between
+    if cached is not None and cached["version"] == version - 1:
+        conversation_cache.set(conversation_id, {
+            "version": version,
+            "messages": (cached["messages"] + messages)[-MAX_MESSAGES:],
+        })
+
+
+def get_conversation_cache_stats() -> dict:
+    stats = conversation_cache.stats()
+    stats["stale"] = _stats["stale"]
+    stats["enabled"] = settings.CONVERSATION_CACHE_ENABLED
+    stats["verify"] = settings.CONVERSATION_CACHE_VERIFY
+    return stats
+
+
+@timed_upstream("mongodb")
+async def get_latest_conversation():
+    convo = await async_db.conversations.find_one(
         {},
         sort=[("updated_at", -1)]
     )
 
+    if convo is None or not message_collection_enabled():
+        return convo
+
+    messages = await get_messages(convo["conversation_id"])
+    return attach_messages(convo, messages, MAX_MESSAGES)
+
 
-def list_conversations(limit: int = 20):
-    return list(
-        db.conversations.find(
+@timed_upstream("mongodb")
+async def list_conversations(limit: int = 20):
+    return await (
+        async_db.conversations.find(
             {},
             {
                 "_id": 0,               # don't include MongoDB _id
@@ -72,11 +249,14 @@ def list_conversations(limit: int = 20):
         )
         .sort("updated_at", -1)
         .limit(limit)
+        .to_list()
     )
 
 
-def rename_conversation_by_id(conversation_id: str, new_title: str):
-    result = db.conversations.update_one(
+@timed_upstream("mongodb")
+async def rename_conversation_by_id(conversation_id: str, new_title: str):
+    conversation_cache.pop(conversation_id)
+    result = await async_db.conversations.update_one(
         {"conversation_id": conversation_id},
         {"$set": {
             "title": new_title,
@@ -87,6 +267,10 @@ def rename_conversation_by_id(conversation_id: str, new_title: str):
     return result
 
 
-def delete_conversation_by_id(conversation_id: str):
-    result = db.conversations.delete_one({"conversation_id": conversation_id})
+@timed_upstream("mongodb")
+async def delete_conversation_by_id(conversation_id: str):
+    conversation_cache.pop(conversation_id)
+    result = await async_db.conversations.delete_one({"conversation_id": conversation_id})
+    # Also clears messages left over from MESSAGE_STORE=collection
+    await async_db.messages.delete_many({"conversation_id": conversation_id})
     return result
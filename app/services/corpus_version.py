@@ -0,0 +1,24 @@
+from pymongo import ReturnDocument
+from app.db.mongodb import db, async_db
+from app.core.metrics import timed_upstream
+
+# A single counter bumped whenever the set of searchable chunks changes
+# (embedding a document, deleting one). Anything derived from search
+# results, like cached answers, is stamped with it and goes stale on a bump.
+CORPUS_VERSION_ID = "corpus"
+
+
+def bump_corpus_version() -> int:
+    doc = db.corpus_state.find_one_and_update(
+        {"_id": CORPUS_VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["version"]
+
+
+@timed_upstream("mongodb")
+async def get_corpus_version() -> int:
+    doc = await async_db.corpus_state.find_one({"_id": CORPUS_VERSION_ID})
+    return doc["version"] if doc else 0
@@ -1,5 +1,7 @@
 from datetime import datetime
+from fastapi import HTTPException
 from app.db.mongodb import documents_collection
+from app.services.corpus_version import bump_corpus_version
 
 
 def create_document(metadata: dict) -> dict:
@@ -10,6 +12,7 @@ def create_document(metadata: dict) -> dict:
         # "stored_filename": metadata["stored_filename"],
         "size_bytes": metadata["size_bytes"],
         "content_type": metadata["content_type"],
+        "extraction_engine": metadata.get("extraction_engine"),
         "status": "UPLOADED",
         "created_at": datetime.utcnow(),
     }
@@ -22,12 +25,13 @@ def get_document_by_file_id(file_id: str) -> dict | None:
     return documents_collection.find_one({"file_id": file_id})
 
 
-def store_extracted_text(file_id: str, text: str):
+def store_extracted_text(file_id: str, text: str, page_offsets: list[int] | None = None):
     result = documents_collection.update_one(
         {"file_id": file_id},
         {
             "$set": {
                 "extracted_text": text,
+                "page_offsets": page_offsets,  # character offset where each page starts
                 "status": "EXTRACTED",
                 "extracted_at": datetime.utcnow(),
             }
@@ -70,6 +74,44 @@ def update_embed_status(file_id: str, count: int):
         raise ValueError("Document not found")
 
 
+def get_page_offsets(file_id: str) -> list[int] | None:
+    doc = documents_collection.find_one(
+        {"file_id": file_id},
+        {"page_offsets": 1}
+    )
+    return doc.get("page_offsets") if doc else None
+
+
+def get_embed_checkpoint(file_id: str) -> dict | None:
+    doc = documents_collection.find_one(
+        {"file_id": file_id},
+        {"embed_checkpoint": 1}
+    )
+    return doc.get("embed_checkpoint") if doc else None
+
+
+def save_embed_checkpoint(file_id: str, fingerprint: str, next_chunk: int):
+    documents_collection.update_one(
+        {"file_id": file_id},
+        {
+            "$set": {
+                "embed_checkpoint": {
+                    "fingerprint": fingerprint,
+                    "next_chunk": next_chunk,
+                    "updated_at": datetime.utcnow(),
+                }
+            }
+        }
+    )
+
+
+def clear_embed_checkpoint(file_id: str):
+    documents_collection.update_one(
+        {"file_id": file_id},
+        {"$unset": {"embed_checkpoint": ""}}
+    )
+
+
 def get_document_text(file_id: str) -> str | None:
     doc = documents_collection.find_one(
         {"file_id": file_id},
@@ -101,4 +143,7 @@ def delete_pdf_by_file_id(file_id: str):
 
     documents_collection.delete_one({"file_id": file_id})
 
+    # Cached answers may have come from this document
+    bump_corpus_version()
+
     return {"ok": True}
@@ -0,0 +1,133 @@
+import hashlib
+from array import array
+from datetime import datetime
+from threading import Lock
+
+from bson.binary import Binary
+from pymongo import ASCENDING, UpdateOne
+
+from app.config import settings
+from app.db.mongodb import db
+
+cache_collection = db["embedding_cache"]
+
+# When the cache grows past the limit, trim it down to this fraction of it
+# so we don't run an eviction pass on every store.
+EVICTION_TARGET_RATIO = 0.9
+
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_stats_lock = Lock()
+
+
+def _count(name: str, n: int = 1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def cache_key(model: str, text: str) -> str:
+    # Content-addressed: the same text embedded by the same model maps to the same key
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+def pack_vector(vector: list[float]) -> Binary:
+    # float32 is what the vectors are stored as in Qdrant anyway
+    return Binary(array("f", vector).tobytes())
+
+
+def unpack_vector(data: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+def get_cached_embeddings(model: str, texts: list[str]) -> dict[int, list[float]]:
+    """
+    Look up cached embeddings for a list of texts.
+
+    :return: mapping of index in `texts` to its cached vector (misses are absent)
+    """
+    if not settings.EMBEDDING_CACHE_ENABLED or not texts:
+        return {}
+
+    keys = [cache_key(model, t) for t in texts]
+    found = {
+        doc["key"]: doc["vector"]
+        for doc in cache_collection.find(
+            {"key": {"$in": list(set(keys))}},
+            {"_id": 0, "key": 1, "vector": 1},
+        )
+    }
+
+    if found:
+        # Touch the entries so eviction is least-recently-used
+        cache_collection.update_many(
+            {"key": {"$in": list(found)}},
+            {"$set": {"last_used_at": datetime.utcnow()}},
+        )
+
+    cached = {
+        idx: unpack_vector(found[key])
+        for idx, key in enumerate(keys)
+        if key in found
+    }
+
+    _count("hits", len(cached))
+    _count("misses", len(texts) - len(cached))
+    return cached
+
+
+def store_embeddings(model: str, texts: list[str], vectors: list[list[float]]):
+    if not settings.EMBEDDING_CACHE_ENABLED or not texts:
+        return
+
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"key": cache_key(model, text)},
+            {
+                "$set": {
+                    "model": model,
+                    "dim": len(vector),
+                    "vector": pack_vector(vector),
+                    "last_used_at": now,
+                },
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        )
+        for text, vector in zip(texts, vectors)
+    ]
+    cache_collection.bulk_write(operations, ordered=False)
+    _count("stores", len(operations))
+
+    evict_if_needed()
+
+
+def evict_if_needed():
+    max_entries = settings.EMBEDDING_CACHE_MAX_ENTRIES
+    size = cache_collection.estimated_document_count()
+    if size <= max_entries:
+        return
+
+    excess = size - int(max_entries * EVICTION_TARGET_RATIO)
+    stale_ids = [
+        doc["_id"]
+        for doc in cache_collection.find({}, {"_id": 1})
+        .sort("last_used_at", ASCENDING)
+        .limit(excess)
+    ]
+    if stale_ids:
+        result = cache_collection.delete_many({"_id": {"$in": stale_ids}})
+        _count("evictions", result.deleted_count)
+
+
+def get_cache_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["enabled"] = settings.EMBEDDING_CACHE_ENABLED
+    stats["max_entries"] = settings.EMBEDDING_CACHE_MAX_ENTRIES
+    return stats
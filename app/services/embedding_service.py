@@ -1,15 +1,28 @@
 import uuid
-from openai import OpenAI
-from app.db.qdrant import get_qdrant_client
-from app.core.embeddings import EMBEDDING_MODEL
+import time
+import bisect
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from app.config import settings
+from app.db.qdrant import get_qdrant_client, point_vectors, COLLECTION_NAME
+from app.core.embeddings import EMBEDDING_ID, get_embedding_provider
+from app.services.embedding_cache import get_cached_embeddings, store_embeddings
+from app.services.corpus_version import bump_corpus_version
+from app.core.metrics import observe_upstream
+from app.services.document_repository import (
+    get_page_offsets,
+    get_embed_checkpoint,
+    save_embed_checkpoint,
+    clear_embed_checkpoint,
+)
 
-client = OpenAI()
-
-
-COLLECTION_NAME = "documents_embeddings"
 CHUNK_SIZE = 800
 CHUNK_OVERLAP = 100
 
+# Rough token estimate, errs on the side of overestimating for English text
+CHARS_PER_TOKEN = 3
+
 
 def chunk_text(text: str):
     chunks = []
@@ -23,42 +36,175 @@ def chunk_text(text: str):
     return chunks
 
 
-def embed_and_store(file_id: str, text: str):
+def chunk_page_number(idx: int, page_offsets: list[int]) -> int:
+    # 1-based page the chunk starts on
+    chunk_start = idx * (CHUNK_SIZE - CHUNK_OVERLAP)
+    return bisect.bisect_right(page_offsets, chunk_start)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def batch_chunks(chunks: list[str], start: int = 0) -> list[tuple[int, int]]:
+    """
+    Group chunks into (start, end) index ranges that stay under the per-request
+    input count and token limits of the embeddings API.
+    """
+    batches = []
+    batch_start = start
+    batch_tokens = 0
+
+    for idx in range(start, len(chunks)):
+        tokens = estimate_tokens(chunks[idx])
+        batch_full = (
+            batch_tokens + tokens > settings.EMBEDDING_BATCH_MAX_TOKENS
+            or idx - batch_start >= settings.EMBEDDING_BATCH_MAX_INPUTS
+        )
+        if idx > batch_start and batch_full:
+            batches.append((batch_start, idx))
+            batch_start = idx
+            batch_tokens = 0
+        batch_tokens += tokens
+
+    if batch_start < len(chunks):
+        batches.append((batch_start, len(chunks)))
+
+    return batches
+
+
+def create_embeddings(inputs: list[str]) -> list[list[float]]:
+    # OpenAI (with retries and backoff) or the local model, see EMBEDDING_PROVIDER
+    return get_embedding_provider().embed(inputs)
+
+
+def embed_chunks(chunks: list[str]) -> tuple[list[list[float]], int]:
+    """
+    Embed chunks, only sending the ones missing from the cache to the provider.
+
+    :return: vectors in the same order as `chunks`, and the number of cache hits
+    """
+    vectors = get_cached_embeddings(EMBEDDING_ID, chunks)
+    cache_hits = len(vectors)
+
+    missing = [idx for idx in range(len(chunks)) if idx not in vectors]
+    if missing:
+        missing_chunks = [chunks[idx] for idx in missing]
+        new_vectors = create_embeddings(missing_chunks)
+        store_embeddings(EMBEDDING_ID, missing_chunks, new_vectors)
+        vectors.update(zip(missing, new_vectors))
+
+    return [vectors[idx] for idx in range(len(chunks))], cache_hits
+
+
+def build_point(file_id: str, idx: int, chunk: str, vector: list[float], page_offsets: list[int] | None = None) -> dict:
+    base_uuid = uuid.UUID(file_id)
+    point_id = uuid.uuid5(base_uuid, str(idx))
+
+    payload = {
+        "file_id": file_id,
+        "chunk_index": idx,
+        "text": chunk,
+    }
+    if page_offsets:
+        payload["page"] = chunk_page_number(idx, page_offsets)
+
+    return {
+        # "id": str(uuid.uuid4()), # valid UUID but not deterministic
+        # "id": f"{file_id}_{idx}", # deterministic but not valid UUID
+        "id": str(point_id), # valid UUID and deterministic
+        "vector": point_vectors(vector, chunk),
+        "payload": payload,
+    }
+
+
+def embedding_fingerprint(text: str) -> str:
+    # A checkpoint is only valid for the same text, chunking and model
+    hasher = hashlib.sha256()
+    hasher.update(f"{EMBEDDING_ID}:{CHUNK_SIZE}:{CHUNK_OVERLAP}:".encode("utf-8"))
+    hasher.update(text.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def embed_and_store(file_id: str, text: str, chunks: list[str] | None = None) -> dict:
     if not text:
         raise ValueError("No extracted text found")
 
+    started_at = time.perf_counter()
 
-    chunks = chunk_text(text)
+    if chunks is None:
+        chunks = chunk_text(text)
+    fingerprint = embedding_fingerprint(text)
+    page_offsets = get_page_offsets(file_id)
 
-    qdrant_client = get_qdrant_client()
+    # Resume after the last batch that made it into Qdrant
+    resume_from = 0
+    checkpoint = get_embed_checkpoint(file_id)
+    if checkpoint and checkpoint.get("fingerprint") == fingerprint:
+        resume_from = checkpoint["next_chunk"]
 
-    embeddings = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=chunks
-    )
-
-
-    points = []
-    for idx, emb in enumerate(embeddings.data):
-        base_uuid = uuid.UUID(file_id)
-        point_id = uuid.uuid5(base_uuid, str(idx))
-        
-        points.append({
-            # "id": str(uuid.uuid4()), # valid UUID but not deterministic
-            # "id": f"{file_id}_{idx}", # deterministic but not valid UUID
-            "id": str(point_id), # valid UUID and deterministic
-            "vector": emb.embedding,
-            "payload": {
-                "file_id": file_id,
-                "chunk_index": idx,
-                "text": chunks[idx],
-            }
-        })
-
-    qdrant_client.upsert(
-        collection_name=COLLECTION_NAME,
-        points=points
-    )
-
-    return len(points)
+    batches = iter(batch_chunks(chunks, resume_from))
+    qdrant_client = get_qdrant_client()
 
+    cache_hits = 0
+    batch_count = 0
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=settings.EMBEDDING_CONCURRENCY) as executor:
+
+        def submit_next_batch():
+            batch = next(batches, None)
+            if batch:
+                batch_start, batch_end = batch
+                future = executor.submit(embed_chunks, chunks[batch_start:batch_end])
+                pending.append((batch_start, batch_end, future))
+
+        for _ in range(settings.EMBEDDING_CONCURRENCY):
+            submit_next_batch()
+
+        try:
+            # Batches are embedded concurrently but upserted in order, so the
+            # checkpoint always marks a contiguous prefix of stored chunks
+            while pending:
+                batch_start, batch_end, future = pending.popleft()
+                vectors, hits = future.result()
+                submit_next_batch()
+
+                points = [
+                    build_point(file_id, idx, chunks[idx], vector, page_offsets)
+                    for idx, vector in enumerate(vectors, start=batch_start)
+                ]
+                with observe_upstream("qdrant", "upsert"):
+                    qdrant_client.upsert(
+                        collection_name=COLLECTION_NAME,
+                        points=points
+                    )
+                save_embed_checkpoint(file_id, fingerprint, batch_end)
+
+                cache_hits += hits
+                batch_count += 1
+
+        except Exception:
+            for _, _, future in pending:
+                future.cancel()
+            raise
+
+        finally:
+            # Any upserted batch changes what chat can retrieve
+            if batch_count:
+                bump_corpus_version()
+
+    clear_embed_checkpoint(file_id)
+
+    elapsed = time.perf_counter() - started_at
+    chunks_processed = len(chunks) - resume_from
+
+    return {
+        "chunks_embedded": len(chunks),
+        "chunks_resumed": resume_from,
+        "cache_hits": cache_hits,
+        "cache_misses": chunks_processed - cache_hits,
+        "batches": batch_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "chunks_per_sec": round(chunks_processed / elapsed, 2) if elapsed > 0 else 0.0,
+    }
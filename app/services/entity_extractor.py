@@ -1,7 +1,27 @@
-import spacy
 from collections import defaultdict
+from app.config import settings
+from app.core.model_registry import registry
+from app.inference.client import run_inference
 
-nlp = spacy.load("en_core_web_sm")
+
+def load_nlp():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+
+registry.register("spacy", load_nlp)
+
+
+def get_nlp():
+    return registry.get("spacy")
+
+
+def unused_pipes(nlp) -> list[str]:
+    # Only NER is used. Keep the shared tok2vec only if NER listens to it.
+    ner_pipes = {"ner"}
+    if "tok2vec" in nlp.pipe_names and "ner" in nlp.get_pipe("tok2vec").listening_components:
+        ner_pipes.add("tok2vec")
+    return [name for name in nlp.pipe_names if name not in ner_pipes]
 
 ALLOWED_LABELS = {
     "PERSON", "ORG", "GPE", "DATE",
@@ -22,39 +42,78 @@ multiple_dots = r'\.{2,}'
 
 
 
-def extract_entities(text: str) -> dict:
-    doc = nlp(text)
-    entities = defaultdict(set)
+def _segments(sentences: list[str]):
+    # Yields (segment, sentence_index). Overlong "sentences" (tables, text
+    # without punctuation) are cut into bounded segments for the model.
+    max_chars = settings.SPACY_MAX_SEGMENT_CHARS
+    for idx, sentence in enumerate(sentences):
+        start = 0
+        while start < len(sentence):
+            end = start + max_chars
+            if end < len(sentence):
+                # cut on a space so we don't split an entity in half
+                space = sentence.rfind(" ", start, end)
+                if space > start:
+                    end = space
+            yield sentence[start:end], idx
+            start = end
+
+
+def extract_entities_and_edges_in_process(text: str) -> tuple[dict, list[dict]]:
+    """
+    Run NER once over the text and return both the document-level entities
+    and the per-sentence entity edges.
 
-    for ent in doc.ents:
-        if ent.label_ in ALLOWED_LABELS:
-            entities[ent.label_].add(ent.text)
+    :param text: extracted document text
+    :type text: str
+
+    :return: entities by label, and the sentences that mention entities
+    :rtype: tuple[dict, list[dict]]
+    """
+    sentences = split_into_sentences(text)
+    document_entities = defaultdict(set)
+    sentence_entities = defaultdict(lambda: defaultdict(set))
+
+    nlp = get_nlp()
+    docs = nlp.pipe(
+        _segments(sentences),
+        as_tuples=True,
+        batch_size=settings.SPACY_BATCH_SIZE,
+        disable=unused_pipes(nlp),
+    )
+    for doc, idx in docs:
+        for ent in doc.ents:
+            if ent.label_ in ALLOWED_LABELS:
+                document_entities[ent.label_].add(ent.text)
+                sentence_entities[idx][ent.label_].add(ent.text)
+
+    edges = [
+        {
+            "sentence_index": idx,
+            "entities": {
+                label: sorted(list(values))
+                for label, values in entities.items()
+            }
+        }
+        for idx, entities in sorted(sentence_entities.items())
+    ]
 
     # convert sets to sorted lists
-    return {k: sorted(list(v)) for k, v in entities.items()}
+    return {k: sorted(list(v)) for k, v in document_entities.items()}, edges
 
 
-def extract_sentence_entity_edges(text: str) -> list[dict]:
-    sentences = split_into_sentences(text)
-    edges = []
+def extract_entities_and_edges(text: str) -> tuple[dict, list[dict]]:
+    # Runs in the inference sidecar when INFERENCE_SOCKET is set
+    return run_inference("extract_entities_and_edges", extract_entities_and_edges_in_process, text)
 
-    for idx, sentence in enumerate(sentences):
-        entities = defaultdict(set)
-        doc = nlp(sentence)
 
-        for ent in doc.ents:
-            if ent.label_ in ALLOWED_LABELS:
-                entities[ent.label_].add(ent.text)
+def extract_entities(text: str) -> dict:
+    entities, _ = extract_entities_and_edges(text)
+    return entities
 
-        if entities:
-            edges.append({
-                "sentence_index": idx,
-                "entities": {
-                    label: sorted(list(values))
-                    for label, values in entities.items()
-                }
-            })
 
+def extract_sentence_entity_edges(text: str) -> list[dict]:
+    _, edges = extract_entities_and_edges(text)
     return edges
 
 
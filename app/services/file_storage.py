@@ -1,6 +1,7 @@
 import os
 import uuid
 import hashlib
+import tempfile
 from fastapi import UploadFile
 from app.core.errors import (
     unsupported_file, 
@@ -15,6 +16,9 @@ BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "storage", "
 # Ensure directory exists
 os.makedirs(BASE_DIR, exist_ok=True)
 
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
 
 def validate_pdf(file: UploadFile):
     # Check presence
@@ -42,21 +46,32 @@ def save_pdf(file: UploadFile) -> dict:
     filename = f"{file_id}.pdf"
     filepath = os.path.join(BASE_DIR, filename)
 
-    #  Read file bytes
-    file_bytes = file.file.read()
-
-    # Save file data
-    with open(filepath, "wb") as out_file:
-        out_file.write(file_bytes)
-
-    # Reset pointer so file can be re-read if needed later
-    file.file.seek(0)
-
-    # Duplicate pdf
-    file_hash = compute_file_hash(file)
-    existing = db.documents.find_one({"file_hash": file_hash})
-    if existing:
-        raise duplicate_file("This PDF has already been uploaded.")
+    # Stream the upload to a temp file in the same directory, hashing as we
+    # go, so memory stays constant and the final rename is atomic
+    hasher = hashlib.sha256()
+    size_bytes = 0
+    fd, temp_path = tempfile.mkstemp(dir=BASE_DIR, suffix=".part")
+
+    try:
+        with os.fdopen(fd, "wb") as out_file:
+            for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+                size_bytes += len(chunk)
+                out_file.write(chunk)
+
+        # Duplicate pdf
+        file_hash = hasher.hexdigest()
+        existing = db.documents.find_one({"file_hash": file_hash}, {"_id": 1})
+        if existing:
+            raise duplicate_file("This PDF has already been uploaded.")
+
+        os.replace(temp_path, filepath)
+
+    except BaseException:
+        # Don't leave partial or duplicate uploads behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
     # Return metadata
     return {
@@ -65,7 +80,7 @@ def save_pdf(file: UploadFile) -> dict:
         "file_hash": file_hash,
         "stored_filename": filename,
         "path": filepath,
-        "size_bytes": os.path.getsize(filepath),
+        "size_bytes": size_bytes,
         "content_type": file.content_type,
     }
 
@@ -78,11 +93,3 @@ def get_pdf_path(file_id: str) -> str:
         raise bad_request("PDF not found.")
 
     return filepath
-
-
-def compute_file_hash(file: UploadFile) -> str:
-    hasher = hashlib.sha256()
-    for chunk in iter(lambda: file.file.read(8192), b""):
-        hasher.update(chunk)
-    file.file.seek(0)
-    return hasher.hexdigest()
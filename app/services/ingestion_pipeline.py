@@ -0,0 +1,257 @@
+import os
+import time
+import socket
+import threading
+from pathlib import Path
+from app.config import settings
+from app.core.metrics import observe_stage
+from app.services import job_repository
+from app.services.file_storage import get_pdf_path
+from app.services.pdf_service import extract_text_and_pages
+from app.services.embedding_service import chunk_text, embed_and_store
+from app.services.entity_extractor import extract_entities_and_edges
+from app.services.document_repository import (
+    get_document_by_file_id,
+    store_extracted_text,
+    store_extracted_entities,
+    get_document_text,
+    update_embed_status,
+)
+
+STAGES = ["extract", "entities", "chunk", "embed"]
+
+
+# ------
+# STAGES
+# ------
+# Each stage gets the job's in-memory context. When a job is resumed on
+# another worker the context starts empty, so stages reload what they need.
+
+def _load_text(ctx: dict) -> str:
+    if "text" not in ctx:
+        ctx["text"] = get_document_text(ctx["file_id"])
+        if not ctx["text"]:
+            raise ValueError("No extracted text found")
+    return ctx["text"]
+
+
+def run_extract(ctx: dict) -> dict:
+    document = get_document_by_file_id(ctx["file_id"])
+    if not document:
+        raise ValueError("Document not found")
+
+    if document.get("extracted_text"):
+        ctx["text"] = document["extracted_text"]
+        return {"text_length": len(ctx["text"]), "skipped": True}
+
+    pdf_path = Path(get_pdf_path(ctx["file_id"]))
+    ctx["text"], page_offsets = extract_text_and_pages(pdf_path, document.get("extraction_engine"))
+    store_extracted_text(ctx["file_id"], ctx["text"], page_offsets)  # MongoDB
+
+    return {"text_length": len(ctx["text"]), "pages": len(page_offsets)}
+
+
+def run_entities(ctx: dict) -> dict:
+    text = _load_text(ctx)
+
+    entities, entity_edges = extract_entities_and_edges(text)
+    store_extracted_entities(ctx["file_id"], entities, entity_edges)  # MongoDB
+
+    return {"entity_labels": len(entities), "entity_edges": len(entity_edges)}
+
+
+def run_chunk(ctx: dict) -> dict:
+    ctx["chunks"] = chunk_text(_load_text(ctx))
+    return {"chunks": len(ctx["chunks"])}
+
+
+def run_embed(ctx: dict) -> dict:
+    result = embed_and_store(ctx["file_id"], _load_text(ctx), chunks=ctx.get("chunks"))
+    update_embed_status(ctx["file_id"], result["chunks_embedded"])
+    return result
+
+
+STAGE_RUNNERS = {
+    "extract": run_extract,
+    "entities": run_entities,
+    "chunk": run_chunk,
+    "embed": run_embed,
+}
+
+
+def _stage_limits() -> dict[str, threading.BoundedSemaphore]:
+    # Caps how many jobs can be in a given stage at once across this process's
+    # workers, e.g. so spaCy doesn't run on every core while embeds wait on I/O.
+    return {
+        "extract": threading.BoundedSemaphore(settings.INGESTION_EXTRACT_CONCURRENCY),
+        "entities": threading.BoundedSemaphore(settings.INGESTION_ENTITIES_CONCURRENCY),
+        "chunk": threading.BoundedSemaphore(settings.INGESTION_WORKERS),
+        "embed": threading.BoundedSemaphore(settings.INGESTION_EMBED_CONCURRENCY),
+    }
+
+
+class LeaseLost(Exception):
+    """The job's lease expired and it was claimed by another worker."""
+
+
+class LeaseHeartbeat:
+    """
+    Renews a job's lease in the background for as long as the worker holds
+    it, including while it waits on a stage limit or runs a long stage.
+    """
+
+    def __init__(self, job_id: str, worker_id: str, lease_seconds: int):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{job_id}", daemon=True)
+
+    def _run(self):
+        # A few renewals per lease period, so one slow or failed update
+        # doesn't let it expire
+        interval = max(self.lease_seconds / 3, 1)
+        while not self._stop.wait(interval):
+            try:
+                if not job_repository.renew_lease(self.job_id, self.worker_id, self.lease_seconds):
+                    self.lost.set()
+                    return
+            except Exception as e:
+                print(f"[INGESTION] {self.worker_id} could not renew the lease on job {self.job_id}: {e}")
+
+    def check(self):
+        if self.lost.is_set():
+            raise LeaseLost()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# -----------
+# WORKER POOL
+# -----------
+class IngestionWorkerPool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.stage_limits = _stage_limits()
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def start(self):
+        for idx in range(self.workers):
+            worker_id = f"{socket.gethostname()}:{os.getpid()}:{idx}"
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(worker_id,),
+                name=f"ingestion-worker-{idx}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        # Wake idle workers so a new job doesn't wait for the next poll
+        self._wake.set()
+
+    def _worker_loop(self, worker_id: str):
+        while not self._stop.is_set():
+            try:
+                job = job_repository.claim_next_job(
+                    worker_id,
+                    settings.INGESTION_LEASE_SECONDS,
+                    settings.INGESTION_MAX_ATTEMPTS,
+                )
+            except Exception as e:
+                print(f"[INGESTION] {worker_id} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                self._wake.wait(settings.INGESTION_POLL_SECONDS)
+                self._wake.clear()
+                continue
+
+            self._run_job(job, worker_id)
+
+    def _run_job(self, job: dict, worker_id: str):
+        job_id = job["job_id"]
+        ctx = {"file_id": job["file_id"]}
+        completed = set(job.get("completed_stages", []))
+        stage = None
+
+        heartbeat = LeaseHeartbeat(job_id, worker_id, settings.INGESTION_LEASE_SECONDS)
+
+        try:
+            with heartbeat:
+                for idx, stage in enumerate(STAGES):
+                    if stage in completed:
+                        continue
+
+                    with self.stage_limits[stage]:
+                        heartbeat.check()
+                        if not job_repository.mark_stage_started(job_id, worker_id, stage):
+                            raise LeaseLost()
+                        started_at = time.perf_counter()
+
+                        with observe_stage("ingestion", stage):
+                            result = STAGE_RUNNERS[stage](ctx)
+
+                        duration_ms = (time.perf_counter() - started_at) * 1000
+                        if not job_repository.mark_stage_completed(
+                            job_id,
+                            worker_id,
+                            stage,
+                            duration_ms,
+                            progress=round((idx + 1) / len(STAGES), 2),
+                            result=result,
+                        ):
+                            raise LeaseLost()
+
+                if not job_repository.mark_job_completed(job_id, worker_id):
+                    raise LeaseLost()
+
+        except LeaseLost:
+            # The new owner carries on, leave its state alone
+            print(f"[INGESTION] {worker_id} lost the lease on job {job_id} at stage {stage}")
+
+        except Exception as e:
+            retry = job.get("attempts", 1) < settings.INGESTION_MAX_ATTEMPTS
+            job_repository.mark_job_failed(job_id, worker_id, stage, str(e), retry=retry)
+            print(f"[INGESTION] job {job_id} failed at stage {stage}: {e}")
+
+
+_pool: IngestionWorkerPool | None = None
+
+
+def start_ingestion_workers():
+    global _pool
+    if _pool is None and settings.INGESTION_WORKERS > 0:
+        _pool = IngestionWorkerPool(settings.INGESTION_WORKERS)
+        _pool.start()
+
+
+def stop_ingestion_workers():
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
+
+
+def enqueue_ingestion(file_id: str) -> dict:
+    job = job_repository.create_job(file_id, STAGES)
+    if _pool is not None:
+        _pool.notify()
+    return job
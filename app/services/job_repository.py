@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from app.db.mongodb import db
+
+jobs_collection = db["ingestion_jobs"]
+
+# Job statuses
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+COMPLETED = "COMPLETED"
+FAILED = "FAILED"
+
+
+def create_job(file_id: str, stages: list[str]) -> dict:
+    now = datetime.utcnow()
+    job = {
+        "job_id": str(uuid4()),
+        "file_id": file_id,
+        "status": QUEUED,
+        "stage": None,
+        "stages": {name: {"status": "PENDING"} for name in stages},
+        "completed_stages": [],
+        "progress": 0.0,
+        "attempts": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    jobs_collection.insert_one(job)
+    job.pop("_id", None)
+    return job
+
+
+def fail_abandoned_jobs(max_attempts: int):
+    # Running jobs whose lease expired on their last attempt, e.g. a document
+    # that crashes the worker process every time
+    now = datetime.utcnow()
+    jobs_collection.update_many(
+        {"status": RUNNING, "lease_expires_at": {"$lt": now}, "attempts": {"$gte": max_attempts}},
+        {
+            "$set": {
+                "status": FAILED,
+                "error": f"Worker stopped responding on all {max_attempts} attempts",
+                "updated_at": now,
+            },
+            "$unset": {"lease_owner": "", "lease_expires_at": ""},
+        }
+    )
+
+
+def claim_next_job(worker_id: str, lease_seconds: int, max_attempts: int) -> dict | None:
+    """
+    Atomically take the oldest queued job, or a running job whose worker
+    stopped renewing its lease (e.g. the process was restarted), as long as
+    it has attempts left.
+    """
+    fail_abandoned_jobs(max_attempts)
+
+    now = datetime.utcnow()
+    return jobs_collection.find_one_and_update(
+        {
+            "$or": [
+                {"status": QUEUED},
+                {"status": RUNNING, "lease_expires_at": {"$lt": now}},
+            ],
+            "attempts": {"$lt": max_attempts},
+        },
+        {
+            "$set": {
+                "status": RUNNING,
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created_at", ASCENDING)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+# Every update below only applies while worker_id still holds the lease, and
+# returns False otherwise: once a job has been handed to another worker, the
+# stale one can't overwrite its state.
+
+def renew_lease(job_id: str, worker_id: str, lease_seconds: int) -> bool:
+    now = datetime.utcnow()
+    result = jobs_collection.update_one(
+        {"job_id": job_id, "lease_owner": worker_id},
+        {"$set": {
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "updated_at": now,
+        }}
+    )
+    return result.matched_count > 0
+
+
+def mark_stage_started(job_id: str, worker_id: str, stage: str) -> bool:
+    now = datetime.utcnow()
+    result = jobs_collection.update_one(
+        {"job_id": job_id, "lease_owner": worker_id},
+        {"$set": {
+            "stage": stage,
+            f"stages.{stage}.status": RUNNING,
+            f"stages.{stage}.started_at": now,
+            "updated_at": now,
+        }}
+    )
+    return result.matched_count > 0
+
+
+def mark_stage_completed(job_id: str, worker_id: str, stage: str, duration_ms: float, progress: float, result: dict | None = None) -> bool:
+    now = datetime.utcnow()
+    update = {
+        f"stages.{stage}.status": COMPLETED,
+        f"stages.{stage}.finished_at": now,
+        f"stages.{stage}.duration_ms": round(duration_ms, 2),
+        "progress": progress,
+        "updated_at": now,
+    }
+    if result:
+        update[f"stages.{stage}.result"] = result
+
+    updated = jobs_collection.update_one(
+        {"job_id": job_id, "lease_owner": worker_id},
+        {
+            "$set": update,
+            "$addToSet": {"completed_stages": stage},
+        }
+    )
+    return updated.matched_count > 0
+
+
+def mark_job_completed(job_id: str, worker_id: str) -> bool:
+    now = datetime.utcnow()
+    result = jobs_collection.update_one(
+        {"job_id": job_id, "lease_owner": worker_id},
+        {
+            "$set": {
+                "status": COMPLETED,
+                "stage": None,
+                "progress": 1.0,
+                "finished_at": now,
+                "updated_at": now,
+            },
+            "$unset": {"lease_owner": "", "lease_expires_at": ""},
+        }
+    )
+    return result.matched_count > 0
+
+
+def mark_job_failed(job_id: str, worker_id: str, stage: str | None, error: str, retry: bool) -> bool:
+    now = datetime.utcnow()
+    update = {
+        "status": QUEUED if retry else FAILED,
+        "error": error,
+        "updated_at": now,
+    }
+    if stage:
+        update[f"stages.{stage}.status"] = FAILED
+
+    result = jobs_collection.update_one(
+        {"job_id": job_id, "lease_owner": worker_id},
+        {
+            "$set": update,
+            "$unset": {"lease_owner": "", "lease_expires_at": ""},
+        }
+    )
+    return result.matched_count > 0
+
+
+def get_job(job_id: str) -> dict | None:
+    return jobs_collection.find_one(
+        {"job_id": job_id},
+        {"_id": 0, "lease_owner": 0, "lease_expires_at": 0}
+    )
+
+
+def list_jobs(file_id: str | None = None, limit: int = 20) -> list[dict]:
+    query = {"file_id": file_id} if file_id else {}
+    return list(
+        jobs_collection.find(
+            query,
+            {"_id": 0, "lease_owner": 0, "lease_expires_at": 0}
+        )
+        .sort("created_at", DESCENDING)
+        .limit(limit)
+    )
@@ -1,5 +1,12 @@
+import math
+import threading
+import unicodedata
+import multiprocessing
 import pdfplumber
+import pypdfium2 as pdfium
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from app.config import settings
 
 
 # Raised when the PDF cannot be processed.
@@ -7,26 +14,193 @@ class PDFExtractionError(Exception):
     pass
 
 
-# Extracts plain text from a PDF file using pdfplumber.
-def extract_text_from_pdf(file_path: Path) -> str:
+# Extraction engines:
+#   pdfium     - pdfium's text layer, fast, no layout analysis
+#   pdfplumber - pdfminer layout analysis, slow but handles odd layouts better
+#   auto       - pdfium, falling back to pdfplumber for pages that look degraded
+ENGINES = ("auto", "pdfium", "pdfplumber")
+
+# pdfium is not thread-safe, even across different documents. Pool workers
+# are single-threaded; this guards in-process use from request/ingestion threads.
+_pdfium_lock = threading.Lock()
+
+# Page ranges handed to the pool per worker, more than one so a range of
+# image-heavy pages doesn't leave the other workers idle
+RANGES_PER_WORKER = 2
+
+_extraction_pool: ProcessPoolExecutor | None = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global _extraction_pool
+    # Ingestion workers and request threads can get here at the same time,
+    # a second pool would never be shut down
+    if _extraction_pool is None:
+        with _extraction_pool_lock:
+            if _extraction_pool is None:
+                _extraction_pool = ProcessPoolExecutor(
+                    max_workers=settings.PDF_EXTRACT_WORKERS,
+                    # the app runs threads (Mongo, ingestion workers), so don't fork
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _extraction_pool
+
+
+def shutdown_extraction_pool():
+    global _extraction_pool
+    with _extraction_pool_lock:
+        pool, _extraction_pool = _extraction_pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def validate_engine(engine: str) -> str:
+    if engine not in ENGINES:
+        raise PDFExtractionError(f"Unknown extraction engine '{engine}', expected one of {', '.join(ENGINES)}.")
+    return engine
+
+
+# Heuristic for pdfium output that is worth re-extracting with pdfplumber.
+def looks_degraded(text: str) -> bool:
+    stripped = text.strip()
+    if not stripped:
+        return True  # may be text pdfium could not map, let pdfplumber try
+
+    # unmapped glyphs come out as replacement / private-use / control characters
+    garbage = sum(
+        1 for ch in stripped
+        if ch == "\ufffd" or (unicodedata.category(ch) in ("Co", "Cc") and ch not in "\n\t")
+    )
+    if garbage / len(stripped) > 0.05:
+        return True
+
+    # words run together when the text layer has no spacing information
+    if len(stripped) > 200 and stripped.count(" ") / len(stripped) < 0.02:
+        return True
+
+    return False
+
+
+def _pdfium_page_text(pdf: pdfium.PdfDocument, idx: int) -> str:
+    page = pdf[idx]
+    textpage = page.get_textpage()
     try:
-        text_content = []
+        return textpage.get_text_range().replace("\r\n", "\n")
+    finally:
+        textpage.close()
+        page.close()
+
+
+def _extract_range_pdfplumber(file_path: str, start: int, end: int) -> list[str]:
+    with pdfplumber.open(file_path) as pdf:
+        return [pdf.pages[idx].extract_text() or "" for idx in range(start, end)]
+
+
+def _extract_range_pdfium(file_path: str, start: int, end: int, fallback: bool) -> list[str]:
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            pages = [_pdfium_page_text(pdf, idx) for idx in range(start, end)]
+        finally:
+            pdf.close()
+
+    if not fallback:
+        return pages
 
+    degraded = [idx for idx, text in enumerate(pages) if looks_degraded(text)]
+    if degraded:
         with pdfplumber.open(file_path) as pdf:
-            if len(pdf.pages) == 0:
-                raise PDFExtractionError("PDF contains no pages.")
+            for idx in degraded:
+                pages[idx] = pdf.pages[start + idx].extract_text() or ""
 
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text_content.append(page_text)
+    return pages
 
-        full_text = "\n".join(text_content).strip()
 
-        if not full_text:
-            raise PDFExtractionError("PDF text extraction returned empty content.")
+# Runs in a pool worker (or inline): extracts pages [start, end) of the PDF.
+def _extract_page_range(file_path: str, start: int, end: int, engine: str) -> list[str]:
+    if engine == "pdfplumber":
+        return _extract_range_pdfplumber(file_path, start, end)
+    return _extract_range_pdfium(file_path, start, end, fallback=engine == "auto")
 
-        return full_text
+
+def get_page_count(file_path: Path) -> int:
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(str(file_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def _split_page_ranges(page_count: int, workers: int) -> list[tuple[int, int]]:
+    range_size = math.ceil(page_count / (workers * RANGES_PER_WORKER))
+    return [
+        (start, min(start + range_size, page_count))
+        for start in range(0, page_count, range_size)
+    ]
+
+
+# Extracts the text of each page, in page order.
+def extract_pages_from_pdf(file_path: Path, engine: str | None = None) -> list[str]:
+    engine = validate_engine(engine or settings.PDF_EXTRACTION_ENGINE)
+
+    try:
+        page_count = get_page_count(file_path)
+
+        if page_count == 0:
+            raise PDFExtractionError("PDF contains no pages.")
+
+        # Process startup costs more than it saves on small documents
+        workers = settings.PDF_EXTRACT_WORKERS
+        if workers <= 1 or page_count < settings.PDF_PARALLEL_MIN_PAGES:
+            return _extract_page_range(str(file_path), 0, page_count, engine)
+
+        pool = get_extraction_pool()
+        futures = [
+            pool.submit(_extract_page_range, str(file_path), start, end, engine)
+            for start, end in _split_page_ranges(page_count, workers)
+        ]
+
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+
+    except PDFExtractionError:
+        raise
 
     except Exception as e:
         raise PDFExtractionError(f"Failed to extract PDF text: {str(e)}")
 
+
+# Joins page texts and returns the offset in the text where each page starts.
+def join_pages(pages: list[str]) -> tuple[str, list[int]]:
+    offsets = []
+    position = 0
+    for page_text in pages:
+        offsets.append(position)
+        position += len(page_text) + 1  # "\n" separator
+
+    joined = "\n".join(pages)
+    full_text = joined.strip()
+
+    # Shift offsets by whatever strip() removed from the start
+    leading = len(joined) - len(joined.lstrip())
+    return full_text, [max(0, offset - leading) for offset in offsets]
+
+
+# Extracts plain text from a PDF file, along with the offset of each page.
+def extract_text_and_pages(file_path: Path, engine: str | None = None) -> tuple[str, list[int]]:
+    full_text, page_offsets = join_pages(extract_pages_from_pdf(file_path, engine))
+
+    if not full_text:
+        raise PDFExtractionError("PDF text extraction returned empty content.")
+
+    return full_text, page_offsets
+
+
+# Extracts plain text from a PDF file.
+def extract_text_from_pdf(file_path: Path, engine: str | None = None) -> str:
+    full_text, _ = extract_text_and_pages(file_path, engine)
+    return full_text
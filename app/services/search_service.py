@@ -1,27 +1,71 @@
-from openai import OpenAI
-from qdrant_client.models import ScoredPoint
-from app.db.qdrant import get_qdrant_client, COLLECTION_NAME
-from app.core.embeddings import EMBEDDING_MODEL
-
-client = OpenAI()
-
-def search_similar_chunks(query: str, top_k: int = 5):
-    qdrant_client = get_qdrant_client()
-
-    # 1. Embed the query
-    query_embedding = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=query
-    ).data[0].embedding
-
-    # 2. Query Qdrant
-    results: list[ScoredPoint] = qdrant_client.query_points(
-        collection_name=COLLECTION_NAME,
-        query=query_embedding,
-        limit=top_k,
-    ).points
-
-    # 3. Shape response
+import asyncio
+from qdrant_client.models import ScoredPoint, Filter, FieldCondition, MatchAny, Prefetch
+from app.config import settings
+from app.core.ttl_cache import TTLCache
+from app.core.metrics import observe_upstream
+from app.db.qdrant import (
+    get_async_qdrant_client,
+    has_sparse_vectors,
+    compact_dim,
+    uses_compact_vectors,
+    COLLECTION_NAME,
+    COLLECTION_PROFILE,
+    COMPACT_VECTOR_NAME,
+    FULL_VECTOR_NAME,
+)
+from app.core.bm25 import SPARSE_VECTOR_NAME, encode_query
+from app.core.embeddings import EMBEDDING_ID, get_embedding_provider, compact_vector
+from app.services.embedding_cache import get_cached_embeddings, store_embeddings
+
+# dense: embeddings only, sparse: BM25 only, hybrid: both fused with RRF
+SEARCH_MODES = ("dense", "sparse", "hybrid")
+if settings.SEARCH_MODE not in SEARCH_MODES:
+    raise ValueError(f"Unknown SEARCH_MODE '{settings.SEARCH_MODE}', expected one of {', '.join(SEARCH_MODES)}")
+
+# Query text -> embedding, keyed by model. Optionally backed by the shared
+# MongoDB embedding cache so other workers' queries count too.
+query_embedding_cache = TTLCache(
+    max_entries=settings.QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+
+async def create_query_embedding(query: str) -> list[float]:
+    if settings.QUERY_EMBEDDING_CACHE_SHARED:
+        cached = await asyncio.to_thread(get_cached_embeddings, EMBEDDING_ID, [query])
+        if cached:
+            return cached[0]
+
+    embedding = (await get_embedding_provider().embed_async([query]))[0]
+
+    if settings.QUERY_EMBEDDING_CACHE_SHARED:
+        await asyncio.to_thread(store_embeddings, EMBEDDING_ID, [query], [embedding])
+
+    return embedding
+
+
+async def embed_query(query: str) -> list[float]:
+    if not settings.QUERY_EMBEDDING_CACHE_ENABLED:
+        return await create_query_embedding(query)
+
+    key = (EMBEDDING_ID, query)
+    embedding = query_embedding_cache.get(key)
+    if embedding is None:
+        embedding = await create_query_embedding(query)
+        query_embedding_cache.set(key, embedding)
+
+    return embedding
+
+
+def get_query_embedding_cache_stats() -> dict:
+    stats = query_embedding_cache.stats()
+    stats["enabled"] = settings.QUERY_EMBEDDING_CACHE_ENABLED
+    stats["shared"] = settings.QUERY_EMBEDDING_CACHE_SHARED
+    stats["model"] = EMBEDDING_ID
+    return stats
+
+
+def shape_results(results: list[ScoredPoint]) -> list[dict]:
     return [
         {
             "score": point.score,
@@ -32,3 +76,138 @@ def search_similar_chunks(query: str, top_k: int = 5):
         for point in results
     ]
 
+
+def build_filter(file_ids: list[str] | None) -> Filter | None:
+    # Applied by Qdrant during the search (file_id has a keyword payload index)
+    if not file_ids:
+        return None
+    return Filter(must=[FieldCondition(key="file_id", match=MatchAny(any=list(file_ids)))])
+
+
+async def search_by_vector(query_embedding: list[float], top_k: int = 5, file_ids: list[str] | None = None) -> list[dict]:
+    if uses_compact_vectors():
+        return await search_compact_then_full(query_embedding, top_k, file_ids)
+
+    with observe_upstream("qdrant", "dense_search"):
+        results: list[ScoredPoint] = (await get_async_qdrant_client().query_points(
+            collection_name=COLLECTION_NAME,
+            query=query_embedding,
+            query_filter=build_filter(file_ids),
+            # hnsw ef and quantization rescoring from the collection profile
+            search_params=COLLECTION_PROFILE.search_params(),
+            limit=top_k,
+        )).points
+
+    return shape_results(results)
+
+
+async def search_compact_then_full(query_embedding: list[float], top_k: int = 5, file_ids: list[str] | None = None) -> list[dict]:
+    # HNSW search over the small compact vectors, then Qdrant re-scores just
+    # those candidates with the full vectors
+    with observe_upstream("qdrant", "compact_search"):
+        results: list[ScoredPoint] = (await get_async_qdrant_client().query_points(
+            collection_name=COLLECTION_NAME,
+            prefetch=Prefetch(
+                query=compact_vector(query_embedding, compact_dim()),
+                using=COMPACT_VECTOR_NAME,
+                filter=build_filter(file_ids),
+                params=COLLECTION_PROFILE.search_params(),
+                limit=top_k * settings.COMPACT_RESCORE_MULTIPLIER,
+            ),
+            query=query_embedding,
+            using=FULL_VECTOR_NAME,
+            limit=top_k,
+        )).points
+
+    return shape_results(results)
+
+
+async def search_by_keywords(query: str, top_k: int = 5, file_ids: list[str] | None = None) -> list[dict]:
+    sparse_query = encode_query(query)
+    if not sparse_query.indices:
+        return []  # only stopwords
+
+    with observe_upstream("qdrant", "sparse_search"):
+        results: list[ScoredPoint] = (await get_async_qdrant_client().query_points(
+            collection_name=COLLECTION_NAME,
+            query=sparse_query,
+            using=SPARSE_VECTOR_NAME,
+            query_filter=build_filter(file_ids),
+            limit=top_k,
+        )).points
+
+    return shape_results(results)
+
+
+def reciprocal_rank_fusion(result_lists: list[list[dict]], top_k: int, k: int = 60) -> list[dict]:
+    """
+    Merge ranked result lists by summing 1 / (k + rank) for each chunk.
+
+    Ranks rather than scores are fused, since cosine and BM25 scores aren't
+    on comparable scales.
+    """
+    fused: dict[tuple[str, int], dict] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            key = (result["file_id"], result["chunk_index"])
+            if key not in fused:
+                fused[key] = {**result, "score": 0.0}
+            fused[key]["score"] += 1 / (k + rank)
+
+    return sorted(fused.values(), key=lambda r: r["score"], reverse=True)[:top_k]
+
+
+def resolve_search_mode(mode: str | None) -> str:
+    # SEARCH_MODE is checked at import, only a requested mode can be unknown
+    if not mode:
+        mode = settings.SEARCH_MODE
+    elif mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}', expected one of {', '.join(SEARCH_MODES)}")
+
+    # Collections created before hybrid search have no sparse vectors
+    if mode != "dense" and not has_sparse_vectors():
+        return "dense"
+    return mode
+
+
+async def search_with_embedding(
+    query: str,
+    query_embedding: list[float],
+    top_k: int = 5,
+    mode: str | None = None,
+    file_ids: list[str] | None = None,
+) -> list[dict]:
+    mode = resolve_search_mode(mode)
+
+    if mode == "dense":
+        return await search_by_vector(query_embedding, top_k, file_ids)
+
+    if mode == "sparse":
+        return await search_by_keywords(query, top_k, file_ids)
+
+    # Hybrid: both searches run concurrently over a deeper candidate list
+    candidates = top_k * settings.HYBRID_CANDIDATE_MULTIPLIER
+    dense_results, sparse_results = await asyncio.gather(
+        search_by_vector(query_embedding, candidates, file_ids),
+        search_by_keywords(query, candidates, file_ids),
+    )
+    return reciprocal_rank_fusion([dense_results, sparse_results], top_k, settings.RRF_K)
+
+
+async def search_similar_chunks(
+    query: str,
+    top_k: int = 5,
+    mode: str | None = None,
+    file_ids: list[str] | None = None,
+) -> list[dict]:
+    mode = resolve_search_mode(mode)
+
+    # Keyword-only search doesn't need the query embedding
+    if mode == "sparse":
+        return await search_by_keywords(query, top_k, file_ids)
+
+    # 1. Embed the query (repeats are served from the cache)
+    query_embedding = await embed_query(query)
+
+    # 2. Query Qdrant and shape the response
+    return await search_with_embedding(query, query_embedding, top_k, mode, file_ids)
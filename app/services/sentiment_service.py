@@ -1,17 +1,103 @@
-from transformers import pipeline
+import os
+import shutil
+import asyncio
+import tempfile
+from pathlib import Path
+from app.config import settings
+from app.core.micro_batcher import MicroBatcher
+from app.core.model_registry import registry
+from app.inference.client import run_inference
 
 model_path = "cardiffnlp/twitter-roberta-base-sentiment-latest"
 
-sentiment_analyzer = pipeline(
-    "sentiment-analysis",
-    # model="distilbert-base-uncased-finetuned-sst-2-english"
-    model=model_path,
-    tokenizer=model_path
-)
+# Backends serving the same model and labels:
+#   fp32 - the original transformers pipeline
+#   int8 - Linear layers dynamically quantized to int8 (PyTorch, CPU)
+#   onnx - exported to ONNX and run with onnxruntime (needs `optimum[onnxruntime]`)
+SENTIMENT_BACKENDS = ("fp32", "int8", "onnx")
 
 
-def detect_emotion(text: str) -> str:
-    result = sentiment_analyzer(text)[0]
+def load_sentiment_pipeline(backend: str):
+    # transformers (and torch) take seconds to import, so only pay for it here
+    from transformers import pipeline
+
+    if backend == "fp32":
+        return pipeline(
+            "sentiment-analysis",
+            # model="distilbert-base-uncased-finetuned-sst-2-english"
+            model=model_path,
+            tokenizer=model_path
+        )
+
+    if backend == "int8":
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        model = torch.ao.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+        )
+        return pipeline(
+            "sentiment-analysis",
+            model=model,
+            tokenizer=AutoTokenizer.from_pretrained(model_path),
+        )
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError:
+            raise RuntimeError("SENTIMENT_BACKEND=onnx requires `optimum[onnxruntime]` to be installed")
+        from transformers import AutoTokenizer
+
+        onnx_dir = export_onnx_model(ORTModelForSequenceClassification, AutoTokenizer)
+        return pipeline(
+            "sentiment-analysis",
+            model=ORTModelForSequenceClassification.from_pretrained(onnx_dir),
+            tokenizer=AutoTokenizer.from_pretrained(onnx_dir),
+        )
+
+    raise ValueError(f"Unknown SENTIMENT_BACKEND '{backend}', expected one of {', '.join(SENTIMENT_BACKENDS)}")
+
+
+def export_onnx_model(model_class, tokenizer_class) -> Path:
+    """
+    Export the model to ONNX once, into SENTIMENT_ONNX_DIR, so later starts
+    (and every other worker) load the exported copy instead of re-exporting.
+    """
+    onnx_dir = Path(settings.SENTIMENT_ONNX_DIR)
+    if (onnx_dir / "model.onnx").exists():
+        return onnx_dir
+
+    # Export next to the target and rename into place, so a worker never
+    # loads a half-written export, and concurrent exports don't clash
+    onnx_dir.parent.mkdir(parents=True, exist_ok=True)
+    export_dir = tempfile.mkdtemp(dir=onnx_dir.parent, prefix=f".{onnx_dir.name}-")
+    try:
+        model_class.from_pretrained(model_path, export=True).save_pretrained(export_dir)
+        tokenizer_class.from_pretrained(model_path).save_pretrained(export_dir)
+        try:
+            os.rename(export_dir, onnx_dir)
+        except OSError:
+            # Another worker finished its export first
+            if not (onnx_dir / "model.onnx").exists():
+                raise
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    return onnx_dir
+
+
+registry.register("sentiment", lambda: load_sentiment_pipeline(settings.SENTIMENT_BACKEND))
+
+
+def get_sentiment_analyzer():
+    return registry.get("sentiment")
+
+
+def label_to_emotion(result: dict) -> str:
     label = result["label"]
     score = result["score"]
 
@@ -25,3 +111,35 @@ def detect_emotion(text: str) -> str:
         return "neutral"
         #return score 
 
+
+def detect_emotions_in_process(texts: list[str]) -> list[str]:
+    # One padded forward pass for the whole batch
+    results = get_sentiment_analyzer()(texts, batch_size=len(texts), truncation=True)
+    return [label_to_emotion(result) for result in results]
+
+
+def detect_emotions(texts: list[str]) -> list[str]:
+    # Runs in the inference sidecar when INFERENCE_SOCKET is set
+    return run_inference("detect_emotions", detect_emotions_in_process, texts)
+
+
+# Concurrent detect_emotion calls are grouped into a single forward pass
+emotion_batcher = MicroBatcher(
+    detect_emotions,
+    max_batch_size=settings.SENTIMENT_MAX_BATCH_SIZE,
+    max_wait_ms=settings.SENTIMENT_MAX_WAIT_MS,
+    name="sentiment-batcher",
+)
+
+
+def detect_emotion(text: str) -> str:
+    if settings.SENTIMENT_BATCHING:
+        return emotion_batcher(text)
+    return detect_emotions([text])[0]
+
+
+async def detect_emotion_async(text: str) -> str:
+    # Waits on the batcher without holding a threadpool thread
+    if settings.SENTIMENT_BATCHING:
+        return await asyncio.wrap_future(emotion_batcher.submit(text))
+    return await asyncio.to_thread(detect_emotion, text)
@@ -0,0 +1,154 @@
+"""
+Requests/sec for POST /chat at increasing concurrency.
+
+OpenAI, Qdrant and MongoDB are replaced by local stand-ins that only simulate
+their latency, so the numbers show how many chats the app itself can keep in
+flight. A blocking copy of the old sync handler is run as a baseline.
+
+    python -m benchmarks.chat_concurrency --concurrency 50 200 --requests 2000
+"""
+import os
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# Every request asks the same question, which would all be answer cache hits
+os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+
+import httpx
+from fastapi import FastAPI
+
+import app.routers.chat as chat_router
+
+# Simulated upstream latencies (seconds)
+MONGO_LATENCY = 0.003
+EMBED_LATENCY = 0.040
+QDRANT_LATENCY = 0.015
+COMPLETION_LATENCY = 0.400
+EMOTION_LATENCY = 0.020
+
+
+# -----------------
+# ASYNC STAND-INS
+# -----------------
+async def fake_get_recent_messages(conversation_id):
+    await asyncio.sleep(MONGO_LATENCY)
+    return []
+
+
+async def fake_embed_query(query):
+    await asyncio.sleep(EMBED_LATENCY)
+    return [0.0] * 8
+
+
+async def fake_search_with_embedding(query, query_embedding, top_k=5, file_ids=None):
+    await asyncio.sleep(QDRANT_LATENCY)
+    return [{"text": "context"}] * top_k
+
+
+async def fake_generate_answer(question, previous_messages, context_chunks):
+    await asyncio.sleep(COMPLETION_LATENCY)
+    return "answer"
+
+
+async def fake_add_messages(*args, **kwargs):
+    await asyncio.sleep(MONGO_LATENCY)
+
+
+async def fake_detect_emotion(text):
+    await asyncio.to_thread(time.sleep, EMOTION_LATENCY)
+    return "neutral"
+
+
+def patch_chat_router():
+    chat_router.get_recent_messages = fake_get_recent_messages
+    chat_router.embed_query = fake_embed_query
+    chat_router.search_with_embedding = fake_search_with_embedding
+    chat_router.generate_answer = fake_generate_answer
+    chat_router.add_messages = fake_add_messages
+    chat_router.detect_emotion_async = fake_detect_emotion
+
+
+# -----------------
+# SYNC BASELINE
+# -----------------
+def sync_chat(request: chat_router.ChatRequest):
+    # Same sequence of blocking calls as the previous sync handler
+    conversation_id = request.conversation_id
+    if not conversation_id:
+        time.sleep(MONGO_LATENCY)
+        conversation_id = str(uuid.uuid4())
+    time.sleep(MONGO_LATENCY)
+    time.sleep(EMBED_LATENCY + QDRANT_LATENCY)
+    time.sleep(COMPLETION_LATENCY)
+    time.sleep(EMOTION_LATENCY)
+    time.sleep(MONGO_LATENCY)
+    time.sleep(MONGO_LATENCY)
+    return {"conversation_id": conversation_id, "answer": "answer"}
+
+
+def build_apps() -> dict[str, FastAPI]:
+    patch_chat_router()
+
+    async_app = FastAPI()
+    async_app.include_router(chat_router.router)
+
+    sync_app = FastAPI()
+    sync_app.post("/chat")(sync_chat)
+
+    return {"sync (baseline)": sync_app, "async": async_app}
+
+
+async def run_load(app: FastAPI, concurrency: int, total_requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    remaining = iter(range(total_requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.post("/chat", json={"question": "How do I reset my password?"})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total_requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    apps = build_apps()
+
+    print(f"{'handler':<18}{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for concurrency in args.concurrency:
+        for name, app in apps.items():
+            result = await run_load(app, concurrency, args.requests)
+            print(
+                f"{name:<18}{concurrency:>12}{result['rps']:>10.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+recall@k, query latency and estimated RAM for each collection profile.
+
+Builds a throwaway collection per profile on the configured Qdrant server,
+loads the same vectors into each (synthetic clustered vectors, or a sample
+of the real collection with --from-collection), waits for indexing, then
+compares search results against exact nearest neighbours.
+
+    python -m benchmarks.collection_profiles --points 50000 --queries 200
+    python -m benchmarks.collection_profiles --from-collection --profiles default scalar
+"""
+import os
+import time
+import argparse
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import numpy as np
+from qdrant_client.models import CollectionStatus, PointStruct
+
+from app.db.collection_profiles import COLLECTION_PROFILES
+from app.db.qdrant import COLLECTION_NAME, VECTOR_SIZE, get_qdrant_client
+
+UPLOAD_BATCH_SIZE = 512
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_vectors(points: int, queries: int, dim: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    # Clustered like real embeddings rather than uniform noise
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(max(points // 200, 8), dim))
+    assignments = rng.integers(len(centroids), size=points + queries)
+    vectors = normalize(centroids[assignments] + rng.normal(scale=0.6, size=(points + queries, dim))).astype(np.float32)
+    return vectors[:points], vectors[points:]
+
+
+def sample_collection(points: int, queries: int) -> tuple[np.ndarray, np.ndarray]:
+    records, _ = get_qdrant_client().scroll(COLLECTION_NAME, limit=points + queries, with_vectors=True)
+    vectors = [r.vector[""] if isinstance(r.vector, dict) else r.vector for r in records]
+    vectors = normalize(np.asarray(vectors, dtype=np.float32))
+    return vectors[:-queries], vectors[-queries:]
+
+
+def wait_until_indexed(name: str, timeout: float = 600):
+    client = get_qdrant_client()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.get_collection(name).status == CollectionStatus.GREEN:
+            return
+        time.sleep(1)
+    raise TimeoutError(f"{name} still indexing after {timeout}s")
+
+
+def build_collection(name: str, profile, vectors: np.ndarray):
+    client = get_qdrant_client()
+    if client.collection_exists(name):
+        client.delete_collection(name)
+
+    client.create_collection(
+        collection_name=name,
+        vectors_config=profile.vectors_config(vectors.shape[1]),
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=profile.quantization_config(),
+    )
+    for start in range(0, len(vectors), UPLOAD_BATCH_SIZE):
+        batch = vectors[start:start + UPLOAD_BATCH_SIZE]
+        client.upsert(
+            collection_name=name,
+            points=[PointStruct(id=start + i, vector=vector.tolist()) for i, vector in enumerate(batch)],
+        )
+    wait_until_indexed(name)
+
+
+def run_profile(name: str, profile, queries: np.ndarray, truth: np.ndarray, top_k: int) -> dict:
+    client = get_qdrant_client()
+    latencies = []
+    hits = 0
+
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        points = client.query_points(
+            collection_name=name,
+            query=query.tolist(),
+            search_params=profile.search_params(),
+            limit=top_k,
+        ).points
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len({point.id for point in points} & set(expected.tolist()))
+
+    latencies.sort()
+    return {
+        "recall": hits / (len(queries) * top_k),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", choices=list(COLLECTION_PROFILES), default=list(COLLECTION_PROFILES))
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--from-collection", action="store_true", help=f"sample vectors from '{COLLECTION_NAME}'")
+    parser.add_argument("--keep", action="store_true", help="don't delete the benchmark collections")
+    args = parser.parse_args()
+
+    if args.from_collection:
+        vectors, queries = sample_collection(args.points, args.queries)
+    else:
+        vectors, queries = synthetic_vectors(args.points, args.queries, VECTOR_SIZE)
+
+    # Exact nearest neighbours (vectors are normalized, so dot = cosine)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.top_k]
+
+    print(f"{len(vectors):,} points x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.top_k}\n")
+    print(f"{'profile':<13}{'recall':>8}{'p50 ms':>9}{'p95 ms':>9}{'est. RAM MB':>13}{'build s':>9}")
+
+    for profile_name in args.profiles:
+        profile = COLLECTION_PROFILES[profile_name]
+        name = f"benchmark_profile_{profile_name}"
+
+        started = time.perf_counter()
+        build_collection(name, profile, vectors)
+        build_seconds = time.perf_counter() - started
+
+        result = run_profile(name, profile, queries, truth, args.top_k)
+        ram_mb = profile.estimated_ram_bytes(len(vectors), vectors.shape[1]) / (1024 * 1024)
+        print(
+            f"{profile_name:<13}{result['recall']:>8.3f}{result['p50_ms']:>9.1f}"
+            f"{result['p95_ms']:>9.1f}{ram_mb:>13.0f}{build_seconds:>9.1f}"
+        )
+
+        if not args.keep:
+            get_qdrant_client().delete_collection(name)
+
+
+if __name__ == "__main__":
+    main()
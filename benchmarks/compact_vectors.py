@@ -0,0 +1,154 @@
+"""
+Full-vector search against compact-vector search with full-vector
+re-scoring, at one or more compact sizes: recall@k (against exact
+full-vector neighbours), latency, and estimated search RAM.
+
+Use --from-collection to sample real embeddings; the synthetic vectors only
+mimic how text-embedding-3 front-loads information into leading dimensions.
+
+    python -m benchmarks.compact_vectors --from-collection --compact-dims 256 512
+    python -m benchmarks.compact_vectors --points 50000 --compact-dims 128 256
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import numpy as np
+from qdrant_client.models import Distance, VectorParams, HnswConfigDiff, PointStruct, Prefetch
+
+from app.core.embeddings import EMBEDDING_DIM
+from app.db.qdrant import COMPACT_VECTOR_NAME, FULL_VECTOR_NAME, get_qdrant_client
+from benchmarks.collection_profiles import normalize, sample_collection, wait_until_indexed
+
+UPLOAD_BATCH_SIZE = 512
+HNSW_M = 16
+
+
+def synthetic_vectors(points: int, queries: int, dim: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    # Clustered, with variance decaying over the dimensions
+    rng = np.random.default_rng(seed)
+    decay = 1 / np.sqrt(np.arange(1, dim + 1))
+    centroids = rng.normal(size=(max(points // 200, 8), dim)) * decay
+    assignments = rng.integers(len(centroids), size=points + queries)
+    noise = rng.normal(scale=0.6, size=(points + queries, dim)) * decay
+    vectors = normalize(centroids[assignments] + noise).astype(np.float32)
+    return vectors[:points], vectors[points:]
+
+
+def build_collection(name: str, vectors: np.ndarray, compact: int):
+    client = get_qdrant_client()
+    if client.collection_exists(name):
+        client.delete_collection(name)
+
+    if compact:
+        vectors_config = {
+            COMPACT_VECTOR_NAME: VectorParams(size=compact, distance=Distance.COSINE),
+            FULL_VECTOR_NAME: VectorParams(
+                size=vectors.shape[1],
+                distance=Distance.COSINE,
+                on_disk=True,
+                hnsw_config=HnswConfigDiff(m=0),
+            ),
+        }
+        compact_vectors = normalize(vectors[:, :compact])
+    else:
+        vectors_config = VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+
+    client.create_collection(name, vectors_config=vectors_config, hnsw_config=HnswConfigDiff(m=HNSW_M))
+
+    for start in range(0, len(vectors), UPLOAD_BATCH_SIZE):
+        points = []
+        for idx in range(start, min(start + UPLOAD_BATCH_SIZE, len(vectors))):
+            if compact:
+                vector = {FULL_VECTOR_NAME: vectors[idx].tolist(), COMPACT_VECTOR_NAME: compact_vectors[idx].tolist()}
+            else:
+                vector = vectors[idx].tolist()
+            points.append(PointStruct(id=idx, vector=vector))
+        client.upsert(name, points=points)
+
+    wait_until_indexed(name)
+
+
+def search(name: str, query: np.ndarray, compact: int, top_k: int, multiplier: int):
+    client = get_qdrant_client()
+    if not compact:
+        return client.query_points(name, query=query.tolist(), limit=top_k).points
+
+    compact_query = query[:compact] / np.linalg.norm(query[:compact])
+    return client.query_points(
+        name,
+        prefetch=Prefetch(query=compact_query.tolist(), using=COMPACT_VECTOR_NAME, limit=top_k * multiplier),
+        query=query.tolist(),
+        using=FULL_VECTOR_NAME,
+        limit=top_k,
+    ).points
+
+
+def estimated_ram_mb(points: int, dim: int, compact: int) -> float:
+    # Vectors searched in RAM plus HNSW links; full vectors on disk don't count
+    searched_dim = compact or dim
+    return (points * searched_dim * 4 + points * HNSW_M * 2 * 4) / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compact-dims", type=int, nargs="+", default=[256, 512])
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rescore-multiplier", type=int, default=4)
+    parser.add_argument("--from-collection", action="store_true", help="sample vectors from the chunk collection")
+    parser.add_argument("--max-recall-loss", type=float, default=0.01, help="fail if compact recall is lower by more than this")
+    parser.add_argument("--keep", action="store_true", help="don't delete the benchmark collections")
+    args = parser.parse_args()
+
+    if args.from_collection:
+        vectors, queries = sample_collection(args.points, args.queries)
+    else:
+        vectors, queries = synthetic_vectors(args.points, args.queries, EMBEDDING_DIM)
+
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.top_k]
+
+    print(f"{len(vectors):,} points x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.top_k}\n")
+    print(f"{'layout':<16}{'recall':>8}{'p50 ms':>9}{'p95 ms':>9}{'est. RAM MB':>13}")
+
+    results = {}
+    for compact in [0] + args.compact_dims:
+        layout = f"compact {compact}" if compact else "full only"
+        name = f"benchmark_compact_{compact}"
+        build_collection(name, vectors, compact)
+
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            points = search(name, query, compact, args.top_k, args.rescore_multiplier)
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += len({point.id for point in points} & set(expected.tolist()))
+
+        latencies.sort()
+        recall = hits / (len(queries) * args.top_k)
+        results[compact] = recall
+        print(
+            f"{layout:<16}{recall:>8.3f}{latencies[len(latencies) // 2]:>9.1f}"
+            f"{latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:>9.1f}"
+            f"{estimated_ram_mb(len(vectors), vectors.shape[1], compact):>13.0f}"
+        )
+
+        if not args.keep:
+            get_qdrant_client().delete_collection(name)
+
+    worst = min(results[c] for c in args.compact_dims)
+    if results[0] - worst > args.max_recall_loss:
+        sys.exit(f"\nCompact recall is {results[0] - worst:.3f} below full-only, over the {args.max_recall_loss} limit")
+
+
+if __name__ == "__main__":
+    main()
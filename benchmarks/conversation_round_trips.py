@@ -0,0 +1,143 @@
+"""
+MongoDB round trips and time per chat turn for the conversation reads and
+writes: the previous path (full document read, then one write per message)
+against the conversation cache, with and without version checks. Needs a
+running MongoDB (MONGODB_URI); commands are counted with pymongo's command
+monitoring.
+
+These are the round trips of a follow-up turn, the whole of its Mongo
+traffic: the corpus version for the answer cache is only read on a new
+conversation's first turn.
+
+Also checks that a version-checked cache picks up a turn written by
+another worker.
+
+    python -m benchmarks.conversation_round_trips --turns 50
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from pymongo import monitoring
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Must be registered before the app's clients are created
+counter = CommandCounter()
+monitoring.register(counter)
+
+from app.config import settings
+from app.db.mongodb import async_db
+from app.services import conversation_service as conversations
+
+
+async def previous_turn(conversation_id: str, turn: int):
+    # get_conversation, then add_message for the question and the answer
+    await async_db.conversations.find_one({"conversation_id": conversation_id}, {"_id": 0})
+    for role in ("user", "assistant"):
+        await async_db.conversations.update_one(
+            {"conversation_id": conversation_id},
+            {
+                "$push": {"messages": {"$each": [conversations.build_message(role, f"{role} {turn}")], "$slice": -10}},
+                "$set": {"updated_at": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+
+
+async def cached_turn(conversation_id: str, turn: int):
+    await conversations.get_recent_messages(conversation_id)
+    await conversations.add_messages(conversation_id, [
+        conversations.build_message("user", f"user {turn}"),
+        conversations.build_message("assistant", f"assistant {turn}"),
+    ])
+
+
+async def run_turns(name: str, turn, turns: int) -> dict:
+    conversation_id = conversations.start_conversation()
+    await conversations.add_messages(conversation_id, [conversations.build_message("user", "first")])
+
+    counter.count = 0
+    started = time.perf_counter()
+    for idx in range(turns):
+        await turn(conversation_id, idx)
+    elapsed = time.perf_counter() - started
+    round_trips = counter.count
+
+    await conversations.delete_conversation_by_id(conversation_id)
+    return {"name": name, "round_trips": round_trips / turns, "ms": elapsed / turns * 1000}
+
+
+async def other_worker_check() -> bool:
+    settings.CONVERSATION_CACHE_VERIFY = True
+    conversation_id = conversations.start_conversation()
+    await conversations.add_messages(conversation_id, [conversations.build_message("user", "first")])
+    await conversations.get_recent_messages(conversation_id)
+
+    # Another worker writes a turn: this worker's cache entry is left as it was
+    stale_entry = conversations.conversation_cache.pop(conversation_id)
+    await conversations.add_messages(conversation_id, [conversations.build_message("assistant", "from another worker")])
+    conversations.conversation_cache.set(conversation_id, stale_entry)
+
+    messages = await conversations.get_recent_messages(conversation_id)
+    await conversations.delete_conversation_by_id(conversation_id)
+    return messages[-1]["content"] == "from another worker"
+
+
+async def run(args):
+    results = []
+    for message_store in args.message_stores:
+        settings.MESSAGE_STORE = message_store
+
+        if message_store == "embedded":
+            # The previous path only had embedded messages
+            settings.CONVERSATION_CACHE_ENABLED = False
+            results.append({**await run_turns("previous", previous_turn, args.turns), "store": message_store})
+
+        settings.CONVERSATION_CACHE_ENABLED = True
+        for verify in (True, False):
+            settings.CONVERSATION_CACHE_VERIFY = verify
+            name = "cache (verify)" if verify else "cache"
+            results.append({**await run_turns(name, cached_turn, args.turns), "store": message_store})
+
+    print(f"{'store':<12}{'path':<16}{'round trips/turn':>18}{'ms/turn':>10}")
+    for result in results:
+        print(f"{result['store']:<12}{result['name']:<16}{result['round_trips']:>18.1f}{result['ms']:>10.2f}")
+
+    if not await other_worker_check():
+        sys.exit("\nThe version check missed a turn written by another worker")
+    print("\nversion check picked up a turn written by another worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--message-stores", nargs="+", default=["embedded", "collection"])
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Embedding throughput (chunks/sec) for each embedding provider on one
+document, using the same chunking and batching as ingestion. Qdrant, MongoDB
+and the embedding cache aren't involved.
+
+The local provider needs no network, so ingestion can be benchmarked
+without paying per call:
+
+    python -m benchmarks.embedding_providers path/to/manual.pdf --providers local
+    python -m benchmarks.embedding_providers path/to/text.txt --providers openai local
+"""
+import os
+import time
+import argparse
+from pathlib import Path
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.core.embedding_providers import EMBEDDING_PROVIDERS, create_embedding_provider
+from app.services.embedding_service import chunk_text, batch_chunks
+from app.services.pdf_service import extract_text_from_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--providers", nargs="+", choices=EMBEDDING_PROVIDERS, default=["local"])
+    parser.add_argument("--max-chunks", type=int, default=0, help="only embed the first N chunks")
+    args = parser.parse_args()
+
+    if args.path.suffix.lower() == ".pdf":
+        text = extract_text_from_pdf(args.path)
+    else:
+        text = args.path.read_text(encoding="utf-8")
+
+    chunks = chunk_text(text)
+    if args.max_chunks:
+        chunks = chunks[:args.max_chunks]
+    batches = batch_chunks(chunks)
+
+    print(f"{len(chunks):,} chunks in {len(batches)} batches\n")
+    print(f"{'provider':<10}{'dim':>6}{'load s':>8}{'embed s':>9}{'chunks/s':>10}")
+
+    for name in args.providers:
+        provider = create_embedding_provider(name)
+
+        # Model load (local) or first connection (openai) isn't part of throughput
+        started = time.perf_counter()
+        provider.embed(chunks[:1])
+        load_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for start, end in batches:
+            vectors = provider.embed(chunks[start:end])
+            assert len(vectors[0]) == provider.dimension
+        elapsed = time.perf_counter() - started
+
+        print(f"{name:<10}{provider.dimension:>6}{load_seconds:>8.1f}{elapsed:>9.1f}{len(chunks) / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Query latency of dense, sparse (BM25) and hybrid (RRF) search against the
+configured Qdrant collection. Query embeddings are computed once up front,
+so only the search itself is timed.
+
+Exits non-zero if hybrid p95 latency is over --budget-ms.
+
+    python -m benchmarks.hybrid_search --runs 50 --budget-ms 60
+    python -m benchmarks.hybrid_search --queries queries.txt --random-vectors
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.core.embeddings import EMBEDDING_DIM
+from app.db.qdrant import create_collection_if_not_exists, has_sparse_vectors, close_qdrant_clients
+from app.services.search_service import SEARCH_MODES, embed_query, search_with_embedding
+
+DEFAULT_QUERIES = [
+    "How do I reset my password?",
+    "What does error code E-4012 mean?",
+    "invoice INV-2024-0031",
+    "Can I change the billing address after the invoice is issued?",
+    "X200 paper jam",
+    "Which plan includes priority support?",
+    "SKU 88-1024-B warranty",
+    "How many users can I add on the basic plan?",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=Path, help="one query per line")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=20, help="passes over the query set per mode")
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    parser.add_argument("--random-vectors", action="store_true", help="don't call the embeddings API")
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        queries = [line.strip() for line in args.queries.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    create_collection_if_not_exists()
+    if not has_sparse_vectors():
+        sys.exit("The collection has no sparse vectors, recreate it and re-embed the documents first")
+
+    if args.random_vectors:
+        embeddings = [[random.random() for _ in range(EMBEDDING_DIM)] for _ in queries]
+    else:
+        embeddings = [await embed_query(query) for query in queries]
+
+    print(f"{len(queries)} queries x {args.runs} runs, top_k {args.top_k}\n")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+
+    p95 = {}
+    for mode in SEARCH_MODES:
+        await search_with_embedding(queries[0], embeddings[0], args.top_k, mode)  # warm up
+
+        latencies = []
+        for _ in range(args.runs):
+            for query, embedding in zip(queries, embeddings):
+                started = time.perf_counter()
+                await search_with_embedding(query, embedding, args.top_k, mode)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        p95[mode] = percentile(latencies, 0.95)
+        print(f"{mode:<10}{percentile(latencies, 0.50):>10.1f}{p95[mode]:>10.1f}{percentile(latencies, 0.99):>10.1f}")
+
+    await close_qdrant_clients()
+
+    if p95["hybrid"] > args.budget_ms:
+        sys.exit(f"\nhybrid p95 {p95['hybrid']:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
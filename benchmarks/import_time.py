@@ -0,0 +1,68 @@
+"""
+Measure how long `import app.main` takes in a fresh interpreter, so startup
+regressions (a heavy model or library loaded at import) get caught.
+
+    python -m benchmarks.import_time --runs 5 --max-seconds 3
+    python -m benchmarks.import_time --top 15   # slowest modules (-X importtime)
+
+Exits non-zero when the median import time is above --max-seconds.
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+TIMED_IMPORT = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+BENCHMARK_ENV = {
+    "ENVIRONMENT": "benchmark",
+    "CORS_ALLOWED_ORIGINS": '["http://localhost:5173"]',
+    "MONGODB_URI": "mongodb://localhost:27017",
+    "MONGODB_DB": "benchmark",
+    "OPENAI_API_KEY": "benchmark",
+}
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    env = {**BENCHMARK_ENV, **os.environ}
+    return subprocess.run([sys.executable, *args], env=env, check=True, capture_output=True, text=True)
+
+
+def slowest_modules(top: int) -> list[tuple[int, str]]:
+    # -X importtime writes "import time: self [us] | cumulative | name" to stderr
+    stderr = run_python("-X", "importtime", "-c", "import app.main").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest imports")
+    args = parser.parse_args()
+
+    timings = [float(run_python("-c", TIMED_IMPORT).stdout.strip()) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"import app.main: median {median:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s ({args.runs} runs)")
+
+    if args.top:
+        print(f"\n{'cumulative ms':>14}  module")
+        for cumulative_us, name in slowest_modules(args.top):
+            print(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+    if args.max_seconds is not None and median > args.max_seconds:
+        sys.exit(f"\nImport time {median:.3f}s is above the {args.max_seconds}s budget")
+
+
+if __name__ == "__main__":
+    main()
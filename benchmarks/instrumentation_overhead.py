@@ -0,0 +1,102 @@
+"""
+Cost of the latency instrumentation: per-call overhead of observe_stage and
+a timed_upstream-decorated coroutine, and requests/sec of a trivial route
+through LoggingMiddleware with metrics on and off (in-process, no network).
+
+    python -m benchmarks.instrumentation_overhead --calls 100000 --requests 5000
+"""
+import os
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("REQUEST_LOGGING", "false")
+
+import httpx
+from fastapi import FastAPI
+from app.config import settings
+from app.core.metrics import observe_stage, timed_upstream
+from app.middleware.logging import LoggingMiddleware
+
+
+@timed_upstream("benchmark", "noop")
+async def timed_noop():
+    return None
+
+
+async def noop():
+    return None
+
+
+async def per_call_us(calls: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(calls):
+        with observe_stage("benchmark", "noop"):
+            pass
+    stage_us = (time.perf_counter() - started) / calls * 1e6
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        await noop()
+    baseline = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        await timed_noop()
+    upstream_us = (time.perf_counter() - started - baseline) / calls * 1e6
+
+    return {"observe_stage": stage_us, "timed_upstream": upstream_us}
+
+
+async def requests_per_sec(requests: int) -> float:
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"item_id": item_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await client.get("/items/0")  # warm up
+        started = time.perf_counter()
+        for idx in range(requests):
+            await client.get(f"/items/{idx}")
+        return requests / (time.perf_counter() - started)
+
+
+async def run(args):
+    results = {}
+    for enabled in (False, True):
+        settings.METRICS_ENABLED = enabled
+        results[enabled] = {
+            **await per_call_us(args.calls),
+            "req_per_sec": await requests_per_sec(args.requests),
+        }
+
+    print(f"{'metrics':<10}{'observe_stage us':>18}{'timed_upstream us':>19}{'req/s':>10}")
+    for enabled, result in results.items():
+        print(
+            f"{'on' if enabled else 'off':<10}{result['observe_stage']:>18.2f}"
+            f"{result['timed_upstream']:>19.2f}{result['req_per_sec']:>10.0f}"
+        )
+
+    overhead = 1 - results[True]["req_per_sec"] / results[False]["req_per_sec"]
+    print(f"\nthroughput cost of metrics: {overhead:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Requests/sec through the logging and upload-limit middleware: the previous
+BaseHTTPMiddleware versions against the plain ASGI ones, for a small GET, a
+1MB upload and a streamed response (in-process, no network).
+
+Also checks that a chunked upload over the limit is rejected with a 413
+before the whole body has been sent.
+
+    python -m benchmarks.middleware_throughput --requests 2000
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("REQUEST_LOGGING", "false")
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.config import settings
+from app.middleware.logging import LoggingMiddleware
+from app.middleware.file_size_limit import LimitUploadSizeMiddleware
+
+UPLOAD_BYTES = 1024 * 1024
+STREAM_CHUNKS = 50
+
+
+class BaseLoggingMiddleware(BaseHTTPMiddleware):
+    # The previous LoggingMiddleware
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        duration = (time.time() - start_time) * 1000
+        if settings.REQUEST_LOGGING:
+            print(f"[LOG] {request.method} {request.url.path} completed in {duration:.2f} ms")
+        return response
+
+
+class BaseLimitUploadSizeMiddleware(BaseHTTPMiddleware):
+    # The previous LimitUploadSizeMiddleware, Content-Length only
+    async def dispatch(self, request: Request, call_next):
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > settings.MAX_UPLOAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": {"error": "upload limit exceeded"}})
+        return await call_next(request)
+
+
+def build_app(logging_middleware, limit_middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(logging_middleware)
+    app.add_middleware(limit_middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+        return {"received": received}
+
+    @app.get("/stream")
+    async def stream():
+        async def tokens():
+            for _ in range(STREAM_CHUNKS):
+                yield b"token "
+        return StreamingResponse(tokens(), media_type="text/plain")
+
+    return app
+
+
+async def requests_per_sec(client: httpx.AsyncClient, requests: int, send) -> float:
+    await send(client)  # warm up
+    started = time.perf_counter()
+    for _ in range(requests):
+        await send(client)
+    return requests / (time.perf_counter() - started)
+
+
+async def ping(client):
+    await client.get("/ping")
+
+
+async def upload(client):
+    await client.post("/upload", content=b"x" * UPLOAD_BYTES)
+
+
+async def stream(client):
+    await client.get("/stream")
+
+
+async def chunked_over_limit(app: FastAPI) -> tuple[int, int]:
+    # Chunked body (no Content-Length) twice the limit
+    chunk = b"x" * 64 * 1024
+    total_chunks = 2 * settings.MAX_UPLOAD_BYTES // len(chunk)
+    sent = 0
+
+    async def body():
+        nonlocal sent
+        for _ in range(total_chunks):
+            sent += len(chunk)
+            yield chunk
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        response = await client.post("/upload", content=body())
+    return response.status_code, sent
+
+
+async def run(args):
+    apps = {
+        "base_http": build_app(BaseLoggingMiddleware, BaseLimitUploadSizeMiddleware),
+        "asgi": build_app(LoggingMiddleware, LimitUploadSizeMiddleware),
+    }
+    workloads = {"GET": ping, "1MB upload": upload, "stream": stream}
+
+    print(f"{'middleware':<12}{'workload':<14}{'req/s':>10}")
+    results = {}
+    for name, app in apps.items():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            for workload, send in workloads.items():
+                requests = args.requests if workload != "1MB upload" else max(1, args.requests // 10)
+                results[name, workload] = await requests_per_sec(client, requests, send)
+                print(f"{name:<12}{workload:<14}{results[name, workload]:>10.0f}")
+
+    print()
+    for workload in workloads:
+        print(f"{workload:<14} speedup {results['asgi', workload] / results['base_http', workload]:.2f}x")
+
+    print()
+    failed = False
+    for name, app in apps.items():
+        status, sent = await chunked_over_limit(app)
+        print(f"{name:<12} chunked upload over the limit: {status}, {sent / (1024 * 1024):.1f}MB sent")
+        failed = failed or (name == "asgi" and (status != 413 or sent >= 2 * settings.MAX_UPLOAD_BYTES))
+
+    if failed:
+        sys.exit("\nThe ASGI limiter didn't stop the chunked upload early")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare PDF extraction engines on a sample corpus: pages/sec for each engine,
+and how closely the pdfium and auto output matches pdfplumber's, page by page.
+
+    python -m benchmarks.pdf_engines storage/pdfs/*.pdf
+    python -m benchmarks.pdf_engines path/to/corpus/
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import difflib
+import statistics
+from pathlib import Path
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.services.pdf_service import ENGINES, get_page_count, _extract_page_range
+
+
+def collect_pdfs(paths: list[str]) -> list[Path]:
+    pdfs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            pdfs.extend(sorted(path.rglob("*.pdf")))
+        elif path.suffix.lower() == ".pdf":
+            pdfs.append(path)
+    return pdfs
+
+
+def normalise(text: str) -> list[str]:
+    # Engines differ in line breaks and spacing, compare words only
+    return re.sub(r"\s+", " ", text).strip().split(" ")
+
+
+def similarity(a: str, b: str) -> float:
+    a_words, b_words = normalise(a), normalise(b)
+    if a_words == b_words:
+        return 1.0
+    return difflib.SequenceMatcher(None, a_words, b_words, autojunk=False).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="PDF files or directories")
+    args = parser.parse_args()
+
+    pdfs = collect_pdfs(args.paths)
+    if not pdfs:
+        sys.exit("No PDFs found")
+
+    timings = {engine: 0.0 for engine in ENGINES}
+    outputs = {engine: [] for engine in ENGINES}
+    total_pages = 0
+
+    for pdf in pdfs:
+        page_count = get_page_count(pdf)
+        total_pages += page_count
+
+        for engine in ENGINES:
+            started = time.perf_counter()
+            outputs[engine].extend(_extract_page_range(str(pdf), 0, page_count, engine))
+            timings[engine] += time.perf_counter() - started
+
+    print(f"{len(pdfs)} PDFs, {total_pages} pages\n")
+    print(f"{'engine':<12}{'pages/sec':>12}{'vs pdfplumber':>16}{'pages < 0.95':>14}")
+
+    reference = outputs["pdfplumber"]
+    for engine in ENGINES:
+        scores = [similarity(page, ref) for page, ref in zip(outputs[engine], reference)]
+        low = sum(1 for score in scores if score < 0.95)
+        print(
+            f"{engine:<12}{total_pages / timings[engine]:>12.1f}"
+            f"{statistics.mean(scores):>16.4f}{low:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
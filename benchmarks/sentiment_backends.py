@@ -0,0 +1,126 @@
+"""
+Compare sentiment backends (fp32, int8, onnx): load time, per-call latency,
+peak memory, and label agreement with fp32 on a fixed sample set. Each
+backend runs in its own process so memory numbers don't mix.
+
+Exits non-zero if a backend agrees with fp32 on fewer than --min-agreement
+of the samples.
+
+    python -m benchmarks.sentiment_backends --backends fp32 int8
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import statistics
+import subprocess
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+SAMPLE_TEXTS = [
+    "How do I reset my password?",
+    "This is the third time the export has failed, I'm really fed up.",
+    "Thanks, that fixed it!",
+    "What does error code E-4012 mean on the invoice page?",
+    "The app keeps logging me out every five minutes and it's driving me mad.",
+    "Can I change the billing address after the invoice has been issued?",
+    "Great support, really quick answer.",
+    "Where can I find the user manual for the X200 model?",
+    "I love the new dashboard, so much easier to use.",
+    "Your documentation is useless and nobody answers my emails.",
+    "Is there a way to export the report as CSV?",
+    "The update broke everything, I want a refund.",
+    "Perfect, exactly what I needed.",
+    "Which plan includes priority support?",
+    "I've been waiting two weeks for a reply, this is unacceptable.",
+    "The installation guide was clear and worked first time.",
+    "How many users can I add on the basic plan?",
+    "Honestly the worst onboarding experience I've had.",
+    "Thank you so much for the quick fix!",
+    "Does the warranty cover water damage?",
+    "It's fine I guess, nothing special.",
+    "The printer still shows a paper jam after following every step.",
+    "Brilliant, the new search is really fast.",
+    "What time zone are the scheduled reports sent in?",
+]
+
+
+def run_worker(backend: str):
+    os.environ["SENTIMENT_BACKEND"] = backend
+    os.environ["SENTIMENT_BATCHING"] = "false"
+
+    from app.services.sentiment_service import detect_emotions, get_sentiment_analyzer
+
+    started = time.perf_counter()
+    get_sentiment_analyzer()
+    load_seconds = time.perf_counter() - started
+
+    detect_emotions(SAMPLE_TEXTS[:2])  # warm up
+
+    latencies = []
+    labels = []
+    for text in SAMPLE_TEXTS * 4:
+        started = time.perf_counter()
+        labels.append(detect_emotions([text])[0])
+        latencies.append(time.perf_counter() - started)
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    print(json.dumps({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "peak_rss_mb": peak_rss_mb,
+        "labels": labels[:len(SAMPLE_TEXTS)],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["fp32", "int8"])
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker)
+        return
+
+    backends = ["fp32"] + [b for b in args.backends if b != "fp32"]
+    results = {}
+    for backend in backends:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sentiment_backends", "--worker", backend],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[backend] = json.loads(output.strip().splitlines()[-1])
+
+    reference = results["fp32"]["labels"]
+    failed = False
+
+    print(f"{'backend':<10}{'load s':>8}{'p50 ms':>10}{'mean ms':>10}{'peak RSS MB':>13}{'agreement':>11}")
+    for backend, result in results.items():
+        agreement = sum(a == b for a, b in zip(result["labels"], reference)) / len(reference)
+        failed = failed or agreement < args.min_agreement
+        print(
+            f"{backend:<10}{result['load_seconds']:>8.1f}{result['p50_ms']:>10.1f}"
+            f"{result['mean_ms']:>10.1f}{result['peak_rss_mb']:>13.0f}{agreement:>11.1%}"
+        )
+
+    if failed:
+        sys.exit(f"\nA backend agreed with fp32 on fewer than {args.min_agreement:.0%} of samples")
+
+
+if __name__ == "__main__":
+    main()
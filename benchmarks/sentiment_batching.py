@@ -0,0 +1,95 @@
+"""
+Emotions/sec and latency percentiles for detect_emotion at different
+concurrency levels, one forward pass per call vs micro-batched.
+
+    python -m benchmarks.sentiment_batching --concurrency 1 8 32 64 --calls 512
+"""
+import os
+import time
+import argparse
+import threading
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("CORS_ALLOWED_ORIGINS", '["http://localhost:5173"]')
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.config import settings
+from app.core.micro_batcher import MicroBatcher
+from app.services.sentiment_service import detect_emotions
+
+SAMPLE_TEXTS = [
+    "How do I reset my password?",
+    "This is the third time the export has failed, I'm really fed up.",
+    "Thanks, that fixed it!",
+    "What does error code E-4012 mean on the invoice page?",
+    "The app keeps logging me out every five minutes and it's driving me mad.",
+    "Can I change the billing address after the invoice has been issued?",
+    "Great support, really quick answer.",
+    "Where can I find the user manual for the X200 model?",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def run(detect, concurrency: int, calls: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(calls))
+
+    def worker():
+        for idx in counter:
+            started = time.perf_counter()
+            detect(SAMPLE_TEXTS[idx % len(SAMPLE_TEXTS)])
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "per_sec": calls / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--calls", type=int, default=512)
+    parser.add_argument("--max-batch-size", type=int, default=settings.SENTIMENT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.SENTIMENT_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    batcher = MicroBatcher(detect_emotions, args.max_batch_size, args.max_wait_ms)
+    modes = {
+        "unbatched": lambda text: detect_emotions([text])[0],
+        "batched": batcher,
+    }
+
+    detect_emotions(SAMPLE_TEXTS)  # warm up
+
+    print(f"batch size {args.max_batch_size}, max wait {args.max_wait_ms} ms\n")
+    print(f"{'mode':<12}{'concurrency':>12}{'emotions/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for concurrency in args.concurrency:
+        for name, detect in modes.items():
+            result = run(detect, concurrency, args.calls)
+            print(
+                f"{name:<12}{concurrency:>12}{result['per_sec']:>12.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()